@@ -5,29 +5,47 @@ import json
 import re
 from google import genai
 from config import Config
+from .scheduler import scheduler
 
 
 class BaseAgent:
     """Base class for all research agents with shared AI capabilities."""
 
-    def __init__(self):
+    # Key into Config.LLM_MODEL_TIERS; subclasses pick the tier their task needs
+    model_tier = "standard"
+
+    def __init__(self, cache=None):
         self.client = genai.Client(api_key=Config.GEMINI_API_KEY)
-        self.model = Config.GEMINI_MODEL
+        self.model = Config.LLM_MODEL_TIERS[self.model_tier]
+        self.cache = cache  # Optional ResearchCache shared across sessions (arXiv searches)
 
-    def _call_llm(self, prompt: str, system_instruction: str = "") -> str:
-        """Call Gemini LLM with the given prompt and optional system instruction."""
-        try:
+    def _call_llm(self, prompt: str, system_instruction: str = "", tier: str | None = None) -> str:
+        """
+        Call Gemini LLM with the given prompt and optional system instruction.
+        `tier` overrides the agent's model tier for this call.
+
+        Raises:
+            LLMError: if the call still fails after the scheduler's retries.
+        """
+        model = Config.LLM_MODEL_TIERS[tier] if tier else self.model
+        return self._generate(model, prompt, system_instruction)
+
+    def _generate(self, model: str, prompt: str, system_instruction: str = "") -> str:
+        """Call Gemini LLM through the shared scheduler (retries, hedging, concurrency limits)."""
+        def request() -> str:
             response = self.client.models.generate_content(
-                model=self.model,
+                model=model,
                 contents=prompt,
                 config=genai.types.GenerateContentConfig(
                     system_instruction=system_instruction or None,
                     temperature=0.4,
+                    # Bounds each attempt even before there is latency history to hedge on
+                    http_options=genai.types.HttpOptions(timeout=int(Config.LLM_REQUEST_TIMEOUT * 1000)),
                 ),
             )
-            return response.text.strip()
-        except Exception as e:
-            return f"[LLM Error]: {str(e)}"
+            return (response.text or "").strip()
+
+        return scheduler.call(model, request, caller=type(self).__name__)
 
     def _parse_json_response(self, text: str) -> dict | list | None:
         """Extract and parse JSON from an LLM response that may contain markdown fences."""
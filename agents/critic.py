@@ -42,6 +42,8 @@ recent advances, methodologies, applications, and limitations.
 class CriticAgent(BaseAgent):
     """Evaluates research coverage and identifies gaps."""
 
+    model_tier = "fast"
+
     def evaluate(self, plan: dict, analysis: dict, iteration: int) -> dict:
         """Evaluate the current research analysis against the plan."""
         prompt = (
@@ -5,6 +5,15 @@ and search queries for arXiv.
 from .base import BaseAgent
 
 
+GAP_SOURCES = {
+    "critic": "The Critic Agent identified the following knowledge gaps:",
+    "analyzer": (
+        "The Analyzer Agent found that the retrieved papers only partially cover, "
+        "or do not cover, the following research questions:"
+    ),
+}
+
+
 PLANNER_SYSTEM = """You are a Research Planning Agent. Your role is to take a broad
 research topic and decompose it into a structured research plan.
 
@@ -53,16 +62,39 @@ class PlannerAgent(BaseAgent):
             }
         return parsed
 
-    def refine_plan(self, original_plan: dict, gaps: list[str]) -> dict:
-        """Refine the research plan based on identified knowledge gaps."""
+    def plan_many(self, topics: list[str]) -> list[dict]:
+        """
+        Generate research plans for several related topics in one LLM call.
+        Topics the response has no usable plan for are planned individually.
+        """
+        prompt = (
+            "Create a comprehensive research plan for each of the following topics. "
+            "Return a JSON array containing one plan per topic, in the same order:\n\n"
+            + "\n".join(f"{i + 1}. {topic}" for i, topic in enumerate(topics))
+        )
+        raw = self._call_llm(prompt, system_instruction=PLANNER_SYSTEM)
+        parsed = self._parse_json_response(raw)
+        if not isinstance(parsed, list) or len(parsed) != len(topics):
+            parsed = [None] * len(topics)
+        return [
+            plan if isinstance(plan, dict) and plan.get("search_queries") else self.plan(topic)
+            for plan, topic in zip(parsed, topics)
+        ]
+
+    def refine_plan(self, original_plan: dict, gaps: list[str], source: str = "critic") -> dict:
+        """
+        Refine the research plan based on identified knowledge gaps.
+        `source` ('critic' or 'analyzer') tells the LLM where the gaps came from.
+        """
         prompt = (
             "You previously generated the following research plan:\n"
             f"```json\n{__import__('json').dumps(original_plan, indent=2)}\n```\n\n"
-            "The Critic Agent identified the following knowledge gaps:\n"
+            f"{GAP_SOURCES[source]}\n"
             + "\n".join(f"- {g}" for g in gaps)
             + "\n\nGenerate additional search queries to fill these gaps. "
             "Return the COMPLETE updated plan (with new queries appended)."
         )
-        raw = self._call_llm(prompt, system_instruction=PLANNER_SYSTEM)
+        # Appending queries to an existing plan is a lighter task than planning
+        raw = self._call_llm(prompt, system_instruction=PLANNER_SYSTEM, tier="fast")
         parsed = self._parse_json_response(raw)
         return parsed if parsed else original_plan
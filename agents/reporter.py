@@ -52,6 +52,8 @@ by their titles and authors. Make the report comprehensive and insightful.
 class ReporterAgent(BaseAgent):
     """Generates structured literature review reports."""
 
+    model_tier = "large"
+
     def generate_report(
         self,
         plan: dict,
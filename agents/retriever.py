@@ -2,42 +2,101 @@
 Retriever Agent — searches the arXiv API and retrieves academic papers
 matching the research plan's queries.
 """
+import re
+import threading
 import time
 import urllib.parse
 import feedparser
 import requests
 from .base import BaseAgent
+from broker import SQLiteBroker
 from config import Config
 
+# arXiv asks for 3 seconds between requests; shared by every retriever in the
+# process so concurrent sessions (e.g. a batch) don't exceed the limit together,
+# and through the broker file by every worker process when BROKER=sqlite.
+ARXIV_REQUEST_INTERVAL = 3
+_arxiv_lock = threading.Lock()
+_last_arxiv_request = 0.0
+_shared_throttle: SQLiteBroker | None = None
+
+# " AND " between terms, but not inside a quoted phrase
+_AND_OUTSIDE_QUOTES = re.compile(r'\s+AND\s+(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def _throttle_arxiv():
+    """Block until the next arXiv request is allowed."""
+    global _last_arxiv_request, _shared_throttle
+    if Config.BROKER == "sqlite":
+        with _arxiv_lock:
+            if _shared_throttle is None:
+                _shared_throttle = SQLiteBroker()
+        wait = _shared_throttle.reserve("arxiv", ARXIV_REQUEST_INTERVAL)
+        if wait > 0:
+            time.sleep(wait)
+        return
+
+    with _arxiv_lock:
+        wait = _last_arxiv_request + ARXIV_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_arxiv_request = time.monotonic()
+
+
+def canonical_query(query: str) -> str:
+    """
+    Normalize an arXiv query so equivalent spellings share one cache entry:
+    whitespace is collapsed, and the terms of a plain AND-conjunction are sorted
+    (``ti:"a" AND abs:"b"`` == ``abs:"b" AND ti:"a"``). Queries using OR, ANDNOT
+    or parentheses are only whitespace-normalized.
+    """
+    query = " ".join(query.split())
+    if "(" in query or re.search(r"\b(OR|ANDNOT)\b", query):
+        return query
+    return " AND ".join(sorted(_AND_OUTSIDE_QUOTES.split(query)))
+
 
 class RetrieverAgent(BaseAgent):
     """Retrieves academic papers from arXiv based on search queries."""
 
-    def search(self, queries: list[dict]) -> dict:
+    def search(self, queries: list[dict], cancel_event: threading.Event | None = None) -> dict:
         """
         Execute each search query against the arXiv API.
         Returns a dict mapping query IDs to lists of paper metadata.
+        If cancel_event is set, stops early and returns the partial results.
         """
         results: dict[str, list[dict]] = {}
         seen_ids: set[str] = set()
 
         for q in queries:
+            if cancel_event is not None and cancel_event.is_set():
+                break
             qid = q.get("id", "unknown")
             query_text = q.get("query", "")
-            papers = self._search_arxiv(query_text)
+            papers = self._cached_search(query_text)
             unique_papers = []
             for p in papers:
                 if p["arxiv_id"] not in seen_ids:
                     seen_ids.add(p["arxiv_id"])
                     unique_papers.append(p)
             results[qid] = unique_papers
-            # Respect arXiv rate-limit (3 seconds between requests)
-            time.sleep(3)
 
         return results
 
+    def _cached_search(self, query: str) -> list[dict]:
+        """Search arXiv through the shared cache, if one is configured."""
+        if self.cache is None:
+            return self._search_arxiv(query)
+        return self.cache.get_or_compute(
+            "arxiv",
+            canonical_query(query),
+            lambda: self._search_arxiv(query),
+            should_cache=lambda result: not any("error" in p for p in result),
+        )
+
     def _search_arxiv(self, query: str) -> list[dict]:
         """Search arXiv and return parsed paper metadata."""
+        _throttle_arxiv()
         # Clean the query — feedparser handles Atom XML from arXiv
         params = {
             "search_query": query,
@@ -0,0 +1,206 @@
+"""
+LLM Scheduler — runs Gemini calls with per-model concurrency limits,
+exponential-backoff retries on transient errors, and hedged requests for
+calls that run past the model's recent p95 latency.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+
+from config import Config
+
+try:
+    from httpx import TimeoutException as HTTPTimeout  # What the Gemini client raises on a timeout
+except ImportError:  # httpx ships with google-genai
+    HTTPTimeout = TimeoutError
+
+# HTTP status codes worth retrying: rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "rate limit", "timed out")
+
+
+class LLMError(RuntimeError):
+    """Raised when an LLM call fails permanently or exhausts its retries."""
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether an exception from the Gemini client looks transient."""
+    if isinstance(exc, (TimeoutError, ConnectionError, HTTPTimeout)):
+        return True
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    message = str(exc)
+    return any(marker.lower() in message.lower() for marker in RETRYABLE_MARKERS)
+
+
+class _Slot:
+    """One request's claim on a model's concurrency slot, released at most once."""
+
+    def __init__(self, semaphore: threading.BoundedSemaphore):
+        self._semaphore = semaphore
+        self._lock = threading.Lock()
+        self._held = False
+        self._sent = False
+        self._abandoned = False
+        self.acquired = threading.Event()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._semaphore.acquire(blocking):
+            return False
+        with self._lock:
+            self._held = True
+        self.acquired.set()
+        return True
+
+    def release(self):
+        with self._lock:
+            held, self._held = self._held, False
+        if held:
+            self._semaphore.release()
+
+    def send(self) -> bool:
+        """Mark the request as sent; False if it was abandoned before it started."""
+        with self._lock:
+            self._sent = not self._abandoned
+            return self._sent
+
+    def abandon(self):
+        """
+        Give up on this request. If it has not been sent it is skipped and its
+        slot freed now; an in-flight request keeps its slot until it returns,
+        so the model's concurrency limit still bounds real requests.
+        """
+        with self._lock:
+            self._abandoned = True
+            sent = self._sent
+        if not sent:
+            self.release()
+
+
+class LLMScheduler:
+    """Shared scheduler for all agents' LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limits: dict[str, threading.BoundedSemaphore] = {}
+        self._latencies: dict[tuple[str, str], deque] = {}
+        self._waiting: dict[str, int] = {}  # Requests queued for a slot, per model
+        self._processes = 1  # Processes sharing each model's concurrency limit
+        self._pool = ThreadPoolExecutor(max_workers=Config.LLM_SCHEDULER_THREADS, thread_name_prefix="llm")
+
+    def share_limits(self, processes: int):
+        """
+        Split each model's concurrency limit across this many processes, each
+        running its own scheduler. Every process keeps at least one slot.
+        """
+        with self._lock:
+            self._processes = max(1, processes)
+            self._limits.clear()
+
+    def _limit(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._limits:
+                limit = Config.LLM_MODEL_CONCURRENCY.get(model, Config.LLM_DEFAULT_CONCURRENCY)
+                self._limits[model] = threading.BoundedSemaphore(max(1, limit // self._processes))
+            return self._limits[model]
+
+    def _record_latency(self, model: str, caller: str, seconds: float):
+        with self._lock:
+            window = self._latencies.setdefault((model, caller), deque(maxlen=Config.LLM_LATENCY_WINDOW))
+            window.append(seconds)
+
+    def hedge_after(self, model: str, caller: str = "") -> float | None:
+        """
+        Recent p95 service time of `caller`'s requests to `model`, or None until
+        there are enough samples. Callers are tracked separately because their
+        prompt sizes, and so their latencies, differ.
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get((model, caller), ()))
+        if len(samples) < Config.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def _timed_call(self, model: str, caller: str, slot: _Slot, fn):
+        if not slot.acquired.is_set():
+            with self._lock:
+                self._waiting[model] = self._waiting.get(model, 0) + 1
+            try:
+                slot.acquire()
+            finally:
+                with self._lock:
+                    self._waiting[model] -= 1
+        try:
+            if not slot.send():
+                raise CancelledError()
+            start = time.monotonic()
+            result = fn()
+        finally:
+            slot.release()
+        # Latency excludes the wait for a slot, so p95 reflects service time only
+        self._record_latency(model, caller, time.monotonic() - start)
+        return result
+
+    def _attempt(self, model: str, caller: str, fn):
+        """One attempt, hedged with a duplicate request if it runs past p95."""
+        semaphore = self._limit(model)
+        primary = _Slot(semaphore)
+        future = self._pool.submit(self._timed_call, model, caller, primary, fn)
+        threshold = self.hedge_after(model, caller)
+        if threshold is None or not Config.LLM_HEDGING:
+            return future.result()
+
+        # Start the hedge clock once the request is actually sent, not while it queues
+        primary.acquired.wait()
+        done, _ = wait([future], timeout=threshold)
+        if done:
+            return future.result()
+
+        # Only hedge into a free slot nobody is queued for; otherwise it just adds load
+        with self._lock:
+            queued = self._waiting.get(model, 0)
+        hedge = _Slot(semaphore)
+        if queued or not hedge.acquire(blocking=False):
+            return future.result()
+
+        slots = {future: primary, self._pool.submit(self._timed_call, model, caller, hedge, fn): hedge}
+        pending = set(slots)
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        return f.result()
+                    error = f.exception()
+            raise error
+        finally:
+            # The loser's result is discarded; it frees its slot when it returns
+            for f in pending:
+                slots[f].abandon()
+
+    def call(self, model: str, fn, caller: str = ""):
+        """
+        Run fn() — a single request to `model` — with retries and hedging.
+        `caller` names the call site (e.g. the agent) whose latency history
+        decides when to hedge.
+
+        Raises:
+            LLMError: if the call fails with a non-transient error or
+                keeps failing after LLM_MAX_RETRIES retries.
+        """
+        for attempt in range(Config.LLM_MAX_RETRIES + 1):
+            try:
+                return self._attempt(model, caller, fn)
+            except Exception as exc:
+                if attempt == Config.LLM_MAX_RETRIES or not is_retryable(exc):
+                    raise LLMError(f"{model}: {exc}") from exc
+                delay = min(Config.LLM_BACKOFF_MAX, Config.LLM_BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+# One scheduler per process, so limits and latency statistics span all agents
+scheduler = LLMScheduler()
@@ -3,19 +3,24 @@ Flask application — Autonomous Research Assistant.
 Provides the web interface and API endpoints for the research pipeline.
 """
 import json
-import queue
 import threading
+import uuid
+from collections import OrderedDict
 from flask import Flask, render_template, request, jsonify, Response
 
+from broker import create_broker
+from checkpoint import CheckpointStore
 from config import Config
-from orchestrator import ResearchOrchestrator
+from jobs import submit_job
+from responses import cached_response
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# In-memory session storage (for demo; could be Redis/DB for production)
-sessions: dict[str, dict] = {}
-event_queues: dict[str, queue.Queue] = {}
+# Jobs, progress events and results go through the broker: in memory by
+# default, or SQLite-backed so they are shared across processes (BROKER=sqlite)
+broker = create_broker()
+checkpoints = CheckpointStore()
 
 
 @app.route("/")
@@ -35,56 +40,223 @@ def start_research():
     if not Config.GEMINI_API_KEY or Config.GEMINI_API_KEY == "your_gemini_api_key_here":
         return jsonify({"error": "GEMINI_API_KEY is not configured. Please set it in your .env file."}), 500
 
-    import uuid
     session_id = str(uuid.uuid4())[:8]
-    event_queues[session_id] = queue.Queue()
+    broker.open_stream(session_id)
+    submit_job(broker, checkpoints, "research", {"session_id": session_id, "topic": topic})
 
-    def run_research():
-        orchestrator = ResearchOrchestrator()
+    return jsonify({"session_id": session_id, "status": "started"})
 
-        def progress_callback(stage, message, data=None):
-            event_queues[session_id].put({
-                "stage": stage,
-                "message": message,
-                "data": data,
-            })
 
-        result = orchestrator.run(topic, progress_callback=progress_callback)
-        sessions[session_id] = result
-        event_queues[session_id].put({"stage": "done", "message": "Session complete.", "data": None})
+@app.route("/api/research/<session_id>/resume", methods=["POST"])
+def resume_research(session_id):
+    """Resume an interrupted session from its last checkpointed phase."""
+    result = broker.get_result(f"session:{session_id}")
+    if result is not None and result.get("status") == "completed":
+        return jsonify({"session_id": session_id, "status": "completed"})
 
-    thread = threading.Thread(target=run_research, daemon=True)
-    thread.start()
+    state = checkpoints.load(session_id)
+    if state is None:
+        return jsonify({"error": "No checkpoint found for this session."}), 404
+    if state["session"].get("status") == "completed":
+        broker.save_result(f"session:{session_id}", state["session"])
+        return jsonify({"session_id": session_id, "status": "completed"})
+    if broker.is_running(session_id):
+        return jsonify({"error": "Session is still running."}), 409
 
-    return jsonify({"session_id": session_id, "status": "started"})
+    broker.delete_result(f"session:{session_id}")
+    broker.open_stream(session_id)
+    submit_job(broker, checkpoints, "resume", {"session_id": session_id})
+
+    return jsonify({"session_id": session_id, "status": "resumed", "phase": state["phase"]})
+
+
+def _event_stream(stream_id: str, is_final) -> Response:
+    """
+    Server-Sent Events response relaying broker events for a session or batch,
+    ending after the first event for which is_final(event) is true.
+    """
+    def generate():
+        for event in broker.listen(stream_id, timeout=120):
+            if event is None:
+                yield f"data: {json.dumps({'stage': 'heartbeat', 'message': 'Still working...'})}\n\n"
+                continue
+            yield f"data: {json.dumps(event)}\n\n"
+            if is_final(event):
+                break
+
+    return Response(generate(), mimetype="text/event-stream")
 
 
 @app.route("/api/research/<session_id>/stream")
 def stream_events(session_id):
     """Server-Sent Events stream for real-time progress updates."""
-    if session_id not in event_queues:
+    if not broker.has_stream(session_id):
         return jsonify({"error": "Session not found."}), 404
+    return _event_stream(session_id, lambda event: event.get("stage") in ("done", "error", "complete"))
 
-    def generate():
-        q = event_queues[session_id]
-        while True:
-            try:
-                event = q.get(timeout=120)
-                yield f"data: {json.dumps(event)}\n\n"
-                if event.get("stage") in ("done", "error", "complete"):
-                    break
-            except queue.Empty:
-                yield f"data: {json.dumps({'stage': 'heartbeat', 'message': 'Still working...'})}\n\n"
 
-    return Response(generate(), mimetype="text/event-stream")
+@app.route("/api/research/batch", methods=["POST"])
+def start_batch():
+    """Start research for a list of topics with shared retrieval and caching."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("topics"), list):
+        return jsonify({"error": "'topics' must be a list of strings."}), 400
+    topics = [t.strip() for t in data["topics"] if isinstance(t, str) and t.strip()]
+    if not topics:
+        return jsonify({"error": "At least one topic is required."}), 400
+    if len(topics) > Config.BATCH_MAX_TOPICS:
+        return jsonify({"error": f"A batch is limited to {Config.BATCH_MAX_TOPICS} topics."}), 400
+
+    if not Config.GEMINI_API_KEY or Config.GEMINI_API_KEY == "your_gemini_api_key_here":
+        return jsonify({"error": "GEMINI_API_KEY is not configured. Please set it in your .env file."}), 500
+
+    batch_id = str(uuid.uuid4())[:8]
+    broker.open_stream(batch_id)
+    submit_job(broker, checkpoints, "batch", {"batch_id": batch_id, "topics": topics})
+
+    return jsonify({"batch_id": batch_id, "status": "started", "topics": len(topics)})
+
+
+@app.route("/api/research/batch/<batch_id>/stream")
+def stream_batch_events(batch_id):
+    """Server-Sent Events stream of per-topic progress for a batch."""
+    if not broker.has_stream(batch_id):
+        return jsonify({"error": "Batch not found."}), 404
+    # Per-topic errors carry a topic_index; an error without one ends the batch
+    return _event_stream(
+        batch_id,
+        lambda event: event.get("stage") == "done" or (event.get("stage") == "error" and "topic_index" not in event),
+    )
+
+
+@app.route("/api/research/batch/<batch_id>")
+def get_batch(batch_id):
+    """Get the summary of a completed batch."""
+    summary = broker.get_result(f"batch:{batch_id}")
+    if summary is None:
+        return jsonify({"error": "Batch not found or still running."}), 404
+    return jsonify(summary)
+
+
+SESSION_NOT_FOUND = ({"error": "Session not found or still running."}, 404)
+MAX_PAGE_SIZE = 200
+SESSION_CACHE_SIZE = 32  # Decoded sessions kept in memory for paged reads
+
+_sessions: OrderedDict[str, tuple[str, dict]] = OrderedDict()  # session_id -> (version, session)
+_sessions_lock = threading.Lock()
+
+
+def _find_session(session_id: str) -> tuple[str, dict] | None:
+    """
+    Look up a finished session and its version (for ETags), falling back to its
+    checkpoint (e.g. after a worker restart). Decoded sessions are cached per
+    version, so paging through a large session loads it from the broker once.
+    """
+    key = f"session:{session_id}"
+    version = broker.result_version(key)
+    if version is None:
+        state = checkpoints.load(session_id)
+        if state is None or state["session"].get("status") != "completed":
+            return None
+        broker.save_result(key, state["session"])
+        version = broker.result_version(key)
+
+    with _sessions_lock:
+        cached = _sessions.get(session_id)
+        if cached is not None and cached[0] == version:
+            _sessions.move_to_end(session_id)
+            return cached
+    session = broker.get_result(key)
+    if session is None:
+        return None
+    with _sessions_lock:
+        _sessions[session_id] = (version, session)
+        _sessions.move_to_end(session_id)
+        while len(_sessions) > SESSION_CACHE_SIZE:
+            _sessions.popitem(last=False)
+    return version, session
+
+
+def _unique_papers(session: dict) -> list[dict]:
+    """Flatten the per-query paper lists into one deduplicated list."""
+    seen: set[str] = set()
+    papers = []
+    for paper_list in session.get("papers", {}).values():
+        for p in paper_list:
+            if "error" not in p and p.get("arxiv_id") not in seen:
+                seen.add(p.get("arxiv_id"))
+                papers.append(p)
+    return papers
+
+
+def _page(items: list) -> dict:
+    """Slice a list using the request's offset/limit query parameters."""
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(MAX_PAGE_SIZE, max(1, request.args.get("limit", 50, type=int)))
+    return {"total": len(items), "offset": offset, "limit": limit, "items": items[offset:offset + limit]}
 
 
 @app.route("/api/research/<session_id>")
 def get_session(session_id):
-    """Get the full results of a completed research session."""
-    if session_id not in sessions:
-        return jsonify({"error": "Session not found or still running."}), 404
-    return jsonify(sessions[session_id])
+    """
+    Get the results of a finished research session.
+    ?fields=a,b limits the response to those top-level fields; the computed
+    fields paper_count and log_count are also available.
+    """
+    found = _find_session(session_id)
+    if found is None:
+        return SESSION_NOT_FOUND
+    version, session = found
+
+    def build():
+        fields = [f for f in request.args.get("fields", "").split(",") if f]
+        if not fields:
+            return session
+        computed = {
+            "paper_count": lambda: len(_unique_papers(session)),
+            "log_count": lambda: len(session.get("agent_log", [])),
+        }
+        return {
+            f: computed[f]() if f in computed else session[f]
+            for f in fields
+            if f in computed or f in session
+        }
+
+    return cached_response(f"{session_id}:{version}", build)
+
+
+@app.route("/api/research/<session_id>/papers")
+def get_session_papers(session_id):
+    """Paginated, deduplicated papers of a session (?offset=&limit=)."""
+    found = _find_session(session_id)
+    if found is None:
+        return SESSION_NOT_FOUND
+    version, session = found
+    return cached_response(f"{session_id}:{version}", lambda: _page(_unique_papers(session)))
+
+
+@app.route("/api/research/<session_id>/log")
+def get_session_log(session_id):
+    """Paginated agent log of a session (?offset=&limit=)."""
+    found = _find_session(session_id)
+    if found is None:
+        return SESSION_NOT_FOUND
+    version, session = found
+    return cached_response(f"{session_id}:{version}", lambda: _page(session.get("agent_log", [])))
+
+
+@app.route("/api/research/<session_id>/report")
+def get_session_report(session_id):
+    """The final literature review as Markdown."""
+    found = _find_session(session_id)
+    if found is None:
+        return SESSION_NOT_FOUND
+    version, session = found
+    return cached_response(
+        f"{session_id}:{version}",
+        lambda: session.get("final_report", ""),
+        mimetype="text/markdown",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""
+Batch research — runs literature reviews for many topics together.
+Topics are planned together, several per planner call, and share one arXiv
+cache, so arXiv queries repeated across topics are only sent once. Each report
+is written to REPORT_OUTPUT_DIR.
+
+Usage:
+    python batch.py "topic one" "topic two"
+    python batch.py --file topics.txt --workers 4
+"""
+import argparse
+import os
+import re
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import PlannerAgent
+from cache import ResearchCache
+from checkpoint import CheckpointStore
+from config import Config
+from orchestrator import ResearchOrchestrator
+
+
+def _slugify(text: str, max_length: int = 60) -> str:
+    """Turn a topic into a filesystem-safe file name fragment."""
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:max_length].rstrip("-") or "topic"
+
+
+class BatchResearchRunner:
+    """Schedules research sessions for a list of topics with shared caches."""
+
+    def __init__(
+        self,
+        batch_id: str | None = None,
+        cache: ResearchCache | None = None,
+        checkpoint_store: CheckpointStore | None = None,
+        max_workers: int | None = None,
+    ):
+        self.batch_id = batch_id or str(uuid.uuid4())[:8]
+        self.cache = cache or ResearchCache()
+        self.checkpoints = checkpoint_store or CheckpointStore()
+        self.max_workers = max_workers or Config.BATCH_MAX_WORKERS
+        self.planner = PlannerAgent(self.cache)
+        self.sessions: dict[str, dict] = {}
+
+    def _plan_chunk(self, topics: list[str]) -> list[dict | None]:
+        """Plan a chunk of topics in one call; None leaves a topic to its orchestrator."""
+        if len(topics) < 2:
+            return [None] * len(topics)
+        try:
+            return self.planner.plan_many(topics)
+        except Exception:
+            return [None] * len(topics)
+
+    def _write_report(self, index: int, topic: str, report: str) -> str:
+        """Write a topic's report to the output directory and return its path."""
+        os.makedirs(Config.REPORT_OUTPUT_DIR, exist_ok=True)
+        path = os.path.join(Config.REPORT_OUTPUT_DIR, f"{self.batch_id}-{index + 1}_{_slugify(topic)}.md")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(report)
+        return path
+
+    def run(self, topics: list[str], progress_callback=None) -> dict:
+        """
+        Research every topic and return a batch summary.
+
+        Args:
+            topics: Research topics; blank and duplicate topics are skipped.
+            progress_callback: Optional callable(index, topic, stage, message, data)
+                invoked with each topic's orchestrator events.
+
+        Returns:
+            dict with per-topic status, report paths and cache statistics.
+        """
+        unique_topics: list[str] = []
+        seen: set[str] = set()
+        for topic in topics:
+            key = " ".join(topic.split()).casefold()
+            if key and key not in seen:
+                seen.add(key)
+                unique_topics.append(topic.strip())
+
+        def run_topic(index: int, topic: str, plan: dict | None) -> dict:
+            session_id = f"{self.batch_id}-{index + 1}"
+            orchestrator = ResearchOrchestrator(
+                session_id=session_id, checkpoint_store=self.checkpoints, cache=self.cache
+            )
+
+            def topic_callback(stage, message, data=None):
+                if progress_callback:
+                    progress_callback(index, topic, stage, message, data)
+
+            session = orchestrator.run(topic, progress_callback=topic_callback, plan=plan)
+            self.sessions[session_id] = session
+            entry = {
+                "topic": topic,
+                "session_id": session_id,
+                "status": session["status"],
+                "coverage_score": session.get("critic_evaluation", {}).get("overall_coverage_score"),
+                "report_path": None,
+            }
+            if session["status"] == "completed":
+                entry["report_path"] = self._write_report(index, topic, session["final_report"])
+            else:
+                entry["error"] = session.get("error", "")
+            return entry
+
+        chunk_size = Config.BATCH_PLAN_CHUNK
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            chunks = [unique_topics[i:i + chunk_size] for i in range(0, len(unique_topics), chunk_size)]
+            plans = [plan for chunk_plans in pool.map(self._plan_chunk, chunks) for plan in chunk_plans]
+            futures = [pool.submit(run_topic, i, topic, plans[i]) for i, topic in enumerate(unique_topics)]
+            entries = [f.result() for f in futures]
+
+        return {
+            "batch_id": self.batch_id,
+            "topics": entries,
+            "skipped_duplicates": len(topics) - len(unique_topics),
+            "cache_stats": self.cache.stats,
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point for batch research."""
+    parser = argparse.ArgumentParser(description="Run literature reviews for many topics at once.")
+    parser.add_argument("topics", nargs="*", help="Research topics")
+    parser.add_argument("--file", help="Text file with one topic per line")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_MAX_WORKERS, help="Topics researched concurrently")
+    args = parser.parse_args(argv)
+
+    topics = list(args.topics)
+    if args.file:
+        with open(args.file, encoding="utf-8") as fh:
+            topics.extend(line.strip() for line in fh if line.strip())
+    if not topics:
+        parser.error("no topics given")
+    if not Config.GEMINI_API_KEY or Config.GEMINI_API_KEY == "your_gemini_api_key_here":
+        parser.error("GEMINI_API_KEY is not configured. Please set it in your .env file.")
+
+    def progress(index, topic, stage, message, data=None):
+        print(f"[{index + 1}] {message}", flush=True)
+
+    runner = BatchResearchRunner(max_workers=args.workers)
+    summary = runner.run(topics, progress_callback=progress)
+    runner.checkpoints.purge(Config.CHECKPOINT_RETENTION_SECONDS)
+
+    print()
+    for entry in summary["topics"]:
+        outcome = entry["report_path"] or f"error: {entry.get('error', '')}"
+        print(f"{entry['session_id']}  {entry['status']:<9}  {entry['topic']}  →  {outcome}")
+    for namespace, counts in summary["cache_stats"].items():
+        print(f"{namespace}: {counts['misses']} calls, {counts['hits']} served from cache")
+    return 0 if all(e["status"] == "completed" for e in summary["topics"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
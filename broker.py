@@ -0,0 +1,306 @@
+"""
+Broker — carries jobs, progress events and finished results between the web
+app and whichever process runs the research.
+
+LocalBroker keeps everything in this process (the single-process default).
+SQLiteBroker stores everything in one SQLite file, so several gunicorn web
+workers and a pool of research worker processes (see worker.py) on the same
+host can share it.
+"""
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+
+class LocalBroker:
+    """In-process broker: events in memory queues, jobs run on threads."""
+
+    in_process = True
+
+    def __init__(self):
+        self._queues: dict[str, queue.Queue] = {}
+        self._results: dict[str, dict] = {}
+        self._versions: dict[str, int] = {}
+        self._saves = itertools.count(1)
+        self._running: set[str] = set()
+
+    def open_stream(self, stream_id: str):
+        """Create the event stream for a new session or batch."""
+        self._queues[stream_id] = queue.Queue()
+
+    def has_stream(self, stream_id: str) -> bool:
+        return stream_id in self._queues
+
+    def publish(self, stream_id: str, event: dict):
+        self._queues[stream_id].put(event)
+
+    def listen(self, stream_id: str, timeout: float):
+        """Yield events as they arrive, or None after `timeout` seconds without one."""
+        q = self._queues[stream_id]
+        while True:
+            try:
+                yield q.get(timeout=timeout)
+            except queue.Empty:
+                yield None
+
+    def save_result(self, key: str, value: dict):
+        self._results[key] = value
+        self._versions[key] = next(self._saves)
+
+    def get_result(self, key: str) -> dict | None:
+        return self._results.get(key)
+
+    def result_version(self, key: str) -> str | None:
+        """Changes every time the result is saved; None if there is no result."""
+        version = self._versions.get(key)
+        return None if version is None else str(version)
+
+    def delete_result(self, key: str):
+        self._results.pop(key, None)
+        self._versions.pop(key, None)
+
+    def set_running(self, stream_id: str, running: bool):
+        """Track whether a job for this stream is executing on a thread."""
+        if running:
+            self._running.add(stream_id)
+        else:
+            self._running.discard(stream_id)
+
+    def is_running(self, stream_id: str) -> bool:
+        return stream_id in self._running
+
+
+class SQLiteBroker:
+    """Broker shared across processes through a SQLite database file."""
+
+    in_process = False
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS streams (
+        stream_id TEXT PRIMARY KEY,
+        created REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stream_id TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS events_stream ON events (stream_id, id);
+    CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        stream_id TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        created REAL NOT NULL,
+        claimed_by TEXT,
+        heartbeat REAL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_stream ON jobs (stream_id, status);
+    CREATE TABLE IF NOT EXISTS throttles (
+        name TEXT PRIMARY KEY,
+        next_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str | None = None, poll_interval: float | None = None):
+        self.path = path or Config.BROKER_PATH
+        self.poll_interval = poll_interval or Config.BROKER_POLL_INTERVAL
+        self._local = threading.local()
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; autocommit with explicit transactions."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── Events ────────────────────────────────────────────────────
+    def open_stream(self, stream_id: str):
+        """Create the event stream, discarding events from a previous run (e.g. before a resume)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM events WHERE stream_id = ?", (stream_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO streams (stream_id, created) VALUES (?, ?)", (stream_id, time.time())
+        )
+        conn.execute("COMMIT")
+
+    def has_stream(self, stream_id: str) -> bool:
+        row = self._connect().execute("SELECT 1 FROM streams WHERE stream_id = ?", (stream_id,)).fetchone()
+        return row is not None
+
+    def publish(self, stream_id: str, event: dict):
+        self._connect().execute(
+            "INSERT INTO events (stream_id, payload, created) VALUES (?, ?, ?)",
+            (stream_id, json.dumps(event), time.time()),
+        )
+
+    def listen(self, stream_id: str, timeout: float):
+        """Yield events as they arrive, or None after `timeout` seconds without one."""
+        conn = self._connect()
+        last_id = 0
+        idle_since = time.monotonic()
+        while True:
+            rows = conn.execute(
+                "SELECT id, payload FROM events WHERE stream_id = ? AND id > ? ORDER BY id",
+                (stream_id, last_id),
+            ).fetchall()
+            for event_id, payload in rows:
+                last_id = event_id
+                yield json.loads(payload)
+            if rows:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= timeout:
+                idle_since = time.monotonic()
+                yield None
+            else:
+                time.sleep(self.poll_interval)
+
+    # ── Results ───────────────────────────────────────────────────
+    def save_result(self, key: str, value: dict):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO results (key, payload, updated) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+
+    def get_result(self, key: str) -> dict | None:
+        row = self._connect().execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def result_version(self, key: str) -> str | None:
+        """Changes every time the result is saved; read without loading the payload."""
+        row = self._connect().execute("SELECT updated FROM results WHERE key = ?", (key,)).fetchone()
+        return repr(row[0]) if row else None
+
+    def delete_result(self, key: str):
+        self._connect().execute("DELETE FROM results WHERE key = ?", (key,))
+
+    # ── Jobs ──────────────────────────────────────────────────────
+    def enqueue(self, kind: str, payload: dict, stream_id: str):
+        """Queue a job for the worker pool; its progress goes to stream_id."""
+        self._connect().execute(
+            "INSERT INTO jobs (kind, payload, stream_id, created) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload), stream_id, time.time()),
+        )
+
+    def claim(self, worker_id: str) -> tuple[int, str, dict] | None:
+        """Atomically take the oldest queued job, or return None if there is none."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', claimed_by = ?, heartbeat = ? WHERE id = ?",
+                    (worker_id, time.time(), row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def heartbeat(self, job_id: int):
+        """Record that the worker running this job is still alive."""
+        self._connect().execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id: int, status: str = "done"):
+        self._connect().execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
+
+    def reap_stale(self, max_age: float | None = None):
+        """
+        Fail running jobs whose worker stopped heartbeating (e.g. the process
+        died), and tell their stream's listeners so the session can be resumed.
+        """
+        cutoff = time.time() - (max_age or Config.JOB_STALE_SECONDS)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stale = conn.execute(
+                "SELECT id, stream_id FROM jobs WHERE status = 'running' AND heartbeat < ?", (cutoff,)
+            ).fetchall()
+            for job_id, stream_id in stale:
+                conn.execute("UPDATE jobs SET status = 'failed' WHERE id = ?", (job_id,))
+                conn.execute(
+                    "INSERT INTO events (stream_id, payload, created) VALUES (?, ?, ?)",
+                    (stream_id, json.dumps({
+                        "stage": "error",
+                        "message": "❌ Error: the research worker stopped responding.",
+                        "data": None,
+                    }), time.time()),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def is_running(self, stream_id: str) -> bool:
+        """Whether a live job (queued, or running with a fresh heartbeat) targets this stream."""
+        self.reap_stale()
+        row = self._connect().execute(
+            "SELECT 1 FROM jobs WHERE stream_id = ? AND status IN ('queued', 'running')", (stream_id,)
+        ).fetchone()
+        return row is not None
+
+    # ── Rate limits ───────────────────────────────────────────────
+    def reserve(self, name: str, interval: float) -> float:
+        """
+        Reserve the next slot of a rate limit shared by every process using this
+        broker, allowing one slot per `interval` seconds. Returns the seconds to
+        wait before the slot starts.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT next_at FROM throttles WHERE name = ?", (name,)).fetchone()
+            now = time.time()
+            slot = max(now, row[0] if row else now)
+            conn.execute(
+                "INSERT INTO throttles (name, next_at) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET next_at = excluded.next_at",
+                (name, slot + interval),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return slot - now
+
+    def purge(self, max_age: float):
+        """Drop events, streams and finished jobs older than max_age seconds."""
+        cutoff = time.time() - max_age
+        conn = self._connect()
+        conn.execute("DELETE FROM events WHERE created < ?", (cutoff,))
+        conn.execute("DELETE FROM streams WHERE created < ?", (cutoff,))
+        conn.execute("DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND created < ?", (cutoff,))
+
+
+def create_broker():
+    """Build the broker selected by Config.BROKER ('local' or 'sqlite')."""
+    if Config.BROKER == "sqlite":
+        os.makedirs(os.path.dirname(Config.BROKER_PATH) or ".", exist_ok=True)
+        return SQLiteBroker()
+    if Config.BROKER != "local":
+        raise ValueError(f"Unknown BROKER {Config.BROKER!r}; expected 'local' or 'sqlite'")
+    return LocalBroker()
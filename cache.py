@@ -0,0 +1,50 @@
+"""
+Shared research cache — memoizes arXiv searches across orchestrator runs, so
+topics in a batch never repeat the same query.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class ResearchCache:
+    """Thread-safe, in-process cache with in-flight deduplication."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], Future] = {}
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, namespace: str, outcome: str):
+        counters = self.stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get_or_compute(self, namespace: str, key: str, compute, should_cache=None):
+        """
+        Return the cached value for (namespace, key), computing it once if absent.
+        Concurrent callers for the same key wait for the first computation instead
+        of repeating it. Values rejected by should_cache(value) are not retained.
+        """
+        with self._lock:
+            future = self._entries.get((namespace, key))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[(namespace, key)] = future
+            self._count(namespace, "misses" if owner else "hits")
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._entries.pop((namespace, key), None)
+            future.set_exception(exc)
+            raise
+
+        if should_cache is not None and not should_cache(value):
+            with self._lock:
+                self._entries.pop((namespace, key), None)
+        future.set_result(value)
+        return value
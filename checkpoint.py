@@ -0,0 +1,62 @@
+"""
+Checkpoint store — persists orchestrator state between pipeline phases so an
+interrupted research session can be resumed from its last completed phase.
+"""
+import json
+import os
+import threading
+import time
+
+from config import Config
+
+
+class CheckpointStore:
+    """File-backed store holding one JSON checkpoint per research session."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or Config.CHECKPOINT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, session_id: str) -> str:
+        # Session IDs come from URLs, so never let them escape the directory
+        safe_id = "".join(ch for ch in session_id if ch.isalnum() or ch in "-_")
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def save(self, session_id: str, state: dict) -> None:
+        """Atomically write the checkpoint for a session."""
+        path = self._path(session_id)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+            os.replace(tmp_path, path)
+
+    def load(self, session_id: str) -> dict | None:
+        """Return the stored checkpoint for a session, or None if there is none."""
+        path = self._path(session_id)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def delete(self, session_id: str) -> None:
+        """Remove the checkpoint for a session if it exists."""
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, max_age: float) -> None:
+        """Remove checkpoints not updated for max_age seconds."""
+        cutoff = time.time() - max_age
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
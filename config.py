@@ -12,7 +12,27 @@ class Config:
     """Application configuration."""
     SECRET_KEY = os.getenv("SECRET_KEY", "research-assistant-secret-key-2026")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-    GEMINI_MODEL = "gemini-2.0-flash"
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+    # LLM scheduling — agents pick a model tier; each model gets its own
+    # concurrency limit, retries with exponential backoff, and hedged requests
+    LLM_MODEL_TIERS = {
+        "fast": os.getenv("GEMINI_FAST_MODEL", "gemini-2.0-flash-lite"),
+        "standard": GEMINI_MODEL,
+        "large": os.getenv("GEMINI_LARGE_MODEL", "gemini-2.5-pro"),
+    }
+    LLM_MODEL_CONCURRENCY = {
+        LLM_MODEL_TIERS["large"]: 2,
+    }
+    LLM_DEFAULT_CONCURRENCY = 8  # Concurrent requests per model not listed above
+    LLM_REQUEST_TIMEOUT = 180  # Seconds before a single attempt is abandoned and retried
+    LLM_MAX_RETRIES = 4
+    LLM_BACKOFF_BASE = 1.0  # Seconds before the first retry; doubles each retry
+    LLM_BACKOFF_MAX = 30.0
+    LLM_HEDGING = True  # Send a duplicate request when a call exceeds the model's p95 latency
+    LLM_HEDGE_MIN_SAMPLES = 20  # Latency samples needed before hedging kicks in
+    LLM_LATENCY_WINDOW = 200  # Recent calls per model used for the p95
+    LLM_SCHEDULER_THREADS = 32
 
     # arXiv API settings
     ARXIV_API_URL = "http://export.arxiv.org/api/query"
@@ -23,6 +43,28 @@ class Config:
     MAX_ITERATIONS = 3  # Max critic loop iterations
     MIN_COVERAGE_SCORE = 7  # Minimum coverage score (out of 10) to stop iterating
     MAX_PAPERS_PER_QUERY = 10
+    SPECULATIVE_REFINEMENT = True  # Refine the plan and prefetch new queries while the critic runs
+    PLATEAU_MIN_SCORE_GAIN = 1  # Stop if the coverage score improves by less than this between iterations
+    PLATEAU_MIN_NEW_PAPERS = 3  # Stop if an iteration adds fewer new papers than this
 
     # Report settings
     REPORT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "reports")
+
+    # Batch settings
+    BATCH_MAX_WORKERS = 4  # Topics researched concurrently in a batch
+    BATCH_MAX_TOPICS = 50
+    BATCH_PLAN_CHUNK = 5  # Topics planned together in one planner call
+
+    # Checkpoint settings (orchestrator state saved after every phase)
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(os.path.dirname(__file__), "checkpoints"))
+    CHECKPOINT_RETENTION_SECONDS = 7 * 24 * 3600  # Checkpoints untouched for this long are purged
+
+    # Deployment settings — "local" runs jobs on threads inside the web process;
+    # "sqlite" shares jobs, events and results through BROKER_PATH so several
+    # web workers and a worker.py process pool can run side by side.
+    BROKER = os.getenv("BROKER", "local")
+    BROKER_PATH = os.getenv("BROKER_PATH", os.path.join(os.path.dirname(__file__), "broker.sqlite3"))
+    BROKER_POLL_INTERVAL = 0.25  # Seconds between polls for new events/jobs
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.cpu_count() or 2))
+    JOB_HEARTBEAT_SECONDS = 10  # How often a worker marks its running job as alive
+    JOB_STALE_SECONDS = 60  # Running jobs without a heartbeat this long are failed
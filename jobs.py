@@ -0,0 +1,101 @@
+"""
+Research jobs — the work behind each API call, runnable either on a thread in
+the web process or in a worker process (see worker.py), reporting through a
+broker.
+"""
+import threading
+
+from batch import BatchResearchRunner
+from checkpoint import CheckpointStore
+from config import Config
+from orchestrator import ResearchOrchestrator
+
+
+def _run_session(broker, checkpoints: CheckpointStore, session_id: str, topic: str | None):
+    """Run (topic given) or resume (topic None) a single research session."""
+    orchestrator = ResearchOrchestrator(session_id=session_id, checkpoint_store=checkpoints)
+
+    def progress_callback(stage, message, data=None):
+        broker.publish(session_id, {
+            "stage": stage,
+            "message": message,
+            "data": data,
+        })
+
+    if topic is None:
+        result = orchestrator.resume(progress_callback=progress_callback)
+    else:
+        result = orchestrator.run(topic, progress_callback=progress_callback)
+    _save_session(broker, checkpoints, session_id, result)
+    broker.publish(session_id, {"stage": "done", "message": "Session complete.", "data": None})
+
+
+def _save_session(broker, checkpoints: CheckpointStore, session_id: str, session: dict):
+    """Store a session result, dropping its checkpoint once a persistent broker holds it."""
+    broker.save_result(f"session:{session_id}", session)
+    if session.get("status") == "completed" and not broker.in_process:
+        checkpoints.delete(session_id)
+
+
+def _run_batch(broker, checkpoints: CheckpointStore, batch_id: str, topics: list[str]):
+    """Run a batch of topics, streaming per-topic progress on the batch's stream."""
+    runner = BatchResearchRunner(batch_id=batch_id, checkpoint_store=checkpoints)
+
+    def progress_callback(index, topic, stage, message, data=None):
+        broker.publish(batch_id, {
+            "topic_index": index,
+            "topic": topic,
+            "stage": stage,
+            "message": message,
+            "data": data,
+        })
+
+    summary = runner.run(topics, progress_callback=progress_callback)
+    for session_id, session in runner.sessions.items():
+        _save_session(broker, checkpoints, session_id, session)
+    broker.save_result(f"batch:{batch_id}", summary)
+    broker.publish(batch_id, {"stage": "done", "message": "Batch complete.", "data": summary})
+
+
+def job_stream_id(payload: dict) -> str:
+    """The event stream a job reports to: its session or batch ID."""
+    return payload.get("session_id") or payload["batch_id"]
+
+
+def execute_job(broker, checkpoints: CheckpointStore, kind: str, payload: dict):
+    """
+    Run one job described by kind ('research', 'resume' or 'batch') and payload.
+    If the job raises, an error event is published before re-raising so that
+    stream listeners are not left waiting.
+    """
+    try:
+        if kind == "research":
+            _run_session(broker, checkpoints, payload["session_id"], payload["topic"])
+        elif kind == "resume":
+            _run_session(broker, checkpoints, payload["session_id"], None)
+        elif kind == "batch":
+            _run_batch(broker, checkpoints, payload["batch_id"], payload["topics"])
+        else:
+            raise ValueError(f"Unknown job kind {kind!r}")
+    except Exception as e:
+        broker.publish(job_stream_id(payload), {"stage": "error", "message": f"❌ Error: {e}", "data": None})
+        raise
+    finally:
+        checkpoints.purge(Config.CHECKPOINT_RETENTION_SECONDS)
+
+
+def submit_job(broker, checkpoints: CheckpointStore, kind: str, payload: dict):
+    """Start a job: on a background thread for an in-process broker, else via the worker pool."""
+    stream_id = job_stream_id(payload)
+    if broker.in_process:
+        def run():
+            try:
+                execute_job(broker, checkpoints, kind, payload)
+            finally:
+                broker.set_running(stream_id, False)
+
+        broker.set_running(stream_id, True)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+    else:
+        broker.enqueue(kind, payload, stream_id)
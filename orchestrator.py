@@ -1,25 +1,54 @@
 """
 Orchestrator — coordinates the multi-agent research workflow.
 Implements the iterative Plan → Retrieve → Analyze → Critique loop.
+
+State is checkpointed after every completed phase, so a session that fails
+part-way (e.g. an LLM error in the reporter) can be resumed without
+re-running planning and retrieval.
 """
 import json
+import threading
 import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from agents import PlannerAgent, RetrieverAgent, AnalyzerAgent, CriticAgent, ReporterAgent
+from agents.retriever import canonical_query
+from cache import ResearchCache
+from checkpoint import CheckpointStore
 from config import Config
 
+# Last completed phase, as recorded in a checkpoint
+PHASE_CREATED = "created"
+PHASE_PLANNED = "planned"
+PHASE_RETRIEVED = "retrieved"
+PHASE_ANALYZED = "analyzed"
+PHASE_CRITIQUED = "critiqued"
+PHASE_REFINED = "refined"
+PHASE_REPORTED = "reported"
+
 
 class ResearchOrchestrator:
     """Coordinates the autonomous research pipeline."""
 
-    def __init__(self):
-        self.planner = PlannerAgent()
-        self.retriever = RetrieverAgent()
-        self.analyzer = AnalyzerAgent()
-        self.critic = CriticAgent()
-        self.reporter = ReporterAgent()
+    def __init__(
+        self,
+        session_id: str | None = None,
+        checkpoint_store: CheckpointStore | None = None,
+        cache: ResearchCache | None = None,
+    ):
+        self.planner = PlannerAgent(cache)
+        self.retriever = RetrieverAgent(cache)
+        self.analyzer = AnalyzerAgent(cache)
+        self.critic = CriticAgent(cache)
+        self.reporter = ReporterAgent(cache)
         self.log: list[dict] = []
+        self.session_id = session_id or str(uuid.uuid4())[:8]
+        self.checkpoints = checkpoint_store or CheckpointStore()
+        self._speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        # Pending refinement for the next iteration: {"plan": Future, "prefetched": dict, "cancel": Event}
+        self._speculation: dict | None = None
 
     def _log_event(self, agent: str, action: str, detail: str = "", data: dict | None = None):
         """Record an event in the research log."""
@@ -33,141 +62,337 @@ class ResearchOrchestrator:
             event["data"] = data
         self.log.append(event)
 
-    def run(self, topic: str, progress_callback=None) -> dict:
+    def _checkpoint(self, state: dict, phase: str):
+        """Mark a phase as completed and persist the state."""
+        state["phase"] = phase
+        state["log"] = self.log
+        self.checkpoints.save(self.session_id, state)
+
+    def _start_speculation(self, plan: dict, analysis: dict) -> dict:
+        """Begin refining the next iteration's plan in the background while the critic runs."""
+        speculation = {"plan": Future(), "prefetched": {}, "cancel": threading.Event()}
+        self._speculator.submit(self._speculate, plan, analysis, speculation)
+        return speculation
+
+    def _speculate(self, plan: dict, analysis: dict, speculation: dict):
+        """
+        Refine the plan from the analyzer's own coverage gaps, then prefetch the
+        new queries one at a time into speculation["prefetched"] until cancelled.
+        The refined plan (None if there were no gaps) resolves speculation["plan"]
+        as soon as it exists, so the refine phase never waits for the prefetch.
+        """
+        cancel = speculation["cancel"]
+        gaps = [
+            f"{c.get('question_text', c.get('question_id', ''))}: {c.get('summary', '')}"
+            for c in analysis.get("question_coverage", [])
+            if c.get("coverage_level") in ("partially_covered", "not_covered")
+        ]
+        try:
+            refined = self.planner.refine_plan(plan, gaps, source="analyzer") if gaps else None
+        except Exception as exc:
+            speculation["plan"].set_exception(exc)
+            return
+        speculation["plan"].set_result(refined)
+        if refined is None:
+            return
+
+        known = {(q.get("id"), q.get("query")) for q in plan.get("search_queries", [])}
+        for q in refined.get("search_queries", []):
+            if cancel.is_set():
+                break
+            if (q.get("id"), q.get("query")) in known:
+                continue
+            qid = q.get("id", "unknown")
+            papers = self.retriever.search([q])
+            speculation["prefetched"][qid] = {"query": q.get("query", ""), "papers": papers.get(qid, [])}
+
+    def _cancel_speculation(self):
+        """Stop any background speculation; queries it already fetched are kept."""
+        if self._speculation is not None:
+            self._speculation["cancel"].set()
+            self._speculation = None
+
+    @staticmethod
+    def _with_critic_queries(plan: dict, gaps: list[dict]) -> dict:
+        """Append the critic's suggested queries for the given gaps to a plan, skipping duplicates."""
+        queries = plan.setdefault("search_queries", [])
+        known = {canonical_query(q.get("query", "")) for q in queries}
+        ids = {q.get("id") for q in queries}
+        for gap in gaps:
+            query = (gap.get("suggested_query") or "").strip()
+            if not query or canonical_query(query) in known:
+                continue
+            n = len(ids) + 1
+            while f"S{n}" in ids:
+                n += 1
+            queries.append({
+                "id": f"S{n}",
+                "query": query,
+                "targets_questions": [],
+                "rationale": gap.get("gap", ""),
+            })
+            known.add(canonical_query(query))
+            ids.add(f"S{n}")
+        return plan
+
+    def run(self, topic: str, progress_callback=None, plan: dict | None = None) -> dict:
         """
         Execute the full autonomous research workflow.
-        
+
         Args:
             topic: The research topic to investigate.
             progress_callback: Optional callable(stage, message, data) for live updates.
-        
+            plan: Optional research plan made ahead of time (e.g. by a batch);
+                the planning phase is skipped when given.
+
         Returns:
             dict with the full research session results.
         """
+        state = {
+            "session_id": self.session_id,
+            "phase": PHASE_CREATED,
+            "topic": topic,
+            "plan": {},
+            "papers": {},
+            "analysis": {},
+            "critic_evaluation": {},
+            "iteration": 0,
+            "accepted": False,
+            "session": {
+                "topic": topic,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "iterations": [],
+                "final_report": "",
+                "status": "running",
+            },
+        }
+        self._checkpoint(state, PHASE_CREATED)
+        if plan is not None:
+            state["plan"] = plan
+            self._log_event("Planner", "complete", f"Using prepared plan: {len(plan.get('research_questions', []))} questions, {len(plan.get('search_queries', []))} queries")
+            self._checkpoint(state, PHASE_PLANNED)
+            if progress_callback:
+                progress_callback("planning_done", "✅ Research plan created", plan)
+        return self._execute(state, progress_callback)
+
+    def resume(self, progress_callback=None) -> dict:
+        """
+        Continue this orchestrator's session from its last completed phase.
+
+        Raises:
+            KeyError: if no checkpoint exists for the session.
+        """
+        state = self.checkpoints.load(self.session_id)
+        if state is None:
+            raise KeyError(f"No checkpoint for session {self.session_id}")
+        if state["phase"] == PHASE_REPORTED:
+            return state["session"]
+
+        self.log = state.get("log", [])
+        self._log_event("Orchestrator", "resume", f"Resuming after phase '{state['phase']}'")
+        state["session"]["status"] = "running"
+        state["session"].pop("error", None)
+        return self._execute(state, progress_callback)
+
+    def _execute(self, state: dict, progress_callback=None) -> dict:
+        """Drive the pipeline forward from the state's last completed phase."""
         def notify(stage: str, message: str, data: dict | None = None):
             if progress_callback:
                 progress_callback(stage, message, data)
 
-        session = {
-            "topic": topic,
-            "started_at": datetime.now(timezone.utc).isoformat(),
-            "iterations": [],
-            "final_report": "",
-            "status": "running",
-        }
+        session = state["session"]
+        topic = state["topic"]
 
         try:
-            # ── Phase 1: Planning ─────────────────────────────────────
-            notify("planning", "🧠 Planner Agent is decomposing the research topic...")
-            self._log_event("Planner", "start", f"Topic: {topic}")
-
-            plan = self.planner.plan(topic)
-            self._log_event("Planner", "complete", f"Generated {len(plan.get('research_questions', []))} questions, {len(plan.get('search_queries', []))} queries")
-            notify("planning_done", "✅ Research plan created", plan)
-
-            all_papers: dict = {}
-            analysis: dict = {}
-            critic_eval: dict = {}
-            iteration = 0
-
-            while iteration < Config.MAX_ITERATIONS:
-                iteration += 1
-                iter_data = {"iteration": iteration}
-                notify("iteration_start", f"🔄 Starting iteration {iteration}/{Config.MAX_ITERATIONS}")
-
-                # ── Phase 2: Retrieval ────────────────────────────────
-                notify("retrieving", f"📚 Retriever Agent is searching arXiv ({len(plan.get('search_queries', []))} queries)...")
-                self._log_event("Retriever", "start", f"Iteration {iteration}")
-
-                new_papers = self.retriever.search(plan.get("search_queries", []))
-                # Merge new papers with existing ones
-                for qid, papers in new_papers.items():
-                    if qid in all_papers:
-                        existing_ids = {p["arxiv_id"] for p in all_papers[qid]}
-                        for p in papers:
-                            if p.get("arxiv_id") and p["arxiv_id"] not in existing_ids:
-                                all_papers[qid].append(p)
-                    else:
-                        all_papers[qid] = papers
-
-                total = self.retriever.get_total_paper_count(all_papers)
-                self._log_event("Retriever", "complete", f"Total unique papers: {total}")
-                notify("retrieving_done", f"✅ Retrieved {total} unique papers", {"total_papers": total})
-
-                # ── Phase 3: Analysis ─────────────────────────────────
-                notify("analyzing", "🔬 Analyzer Agent is synthesizing findings...")
-                self._log_event("Analyzer", "start", f"Iteration {iteration}")
-
-                analysis = self.analyzer.analyze(all_papers, plan.get("research_questions", []))
-                clusters = len(analysis.get("thematic_clusters", []))
-                self._log_event("Analyzer", "complete", f"Found {clusters} thematic clusters")
-                notify("analyzing_done", f"✅ Identified {clusters} thematic clusters", analysis)
-
-                # ── Phase 4: Critique ─────────────────────────────────
-                notify("critiquing", "🧐 Critic Agent is evaluating coverage...")
-                self._log_event("Critic", "start", f"Iteration {iteration}")
-
-                critic_eval = self.critic.evaluate(plan, analysis, iteration)
-                score = critic_eval.get("overall_coverage_score", 0)
-                recommendation = critic_eval.get("recommendation", "accept")
-                gaps = critic_eval.get("knowledge_gaps", [])
-                self._log_event("Critic", "complete", f"Score: {score}/10, Recommendation: {recommendation}, Gaps: {len(gaps)}")
-                notify("critiquing_done", f"✅ Coverage score: {score}/10 — {recommendation.upper()}", critic_eval)
-
-                iter_data.update({
-                    "papers_found": total,
-                    "clusters": clusters,
-                    "coverage_score": score,
-                    "recommendation": recommendation,
-                    "gaps_found": len(gaps),
-                })
-                session["iterations"].append(iter_data)
-
-                # ── Check if we should stop ───────────────────────────
-                if recommendation == "accept" or score >= Config.MIN_COVERAGE_SCORE:
-                    self._log_event("Orchestrator", "stop", f"Accepted at iteration {iteration} with score {score}")
-                    notify("iteration_accepted", f"🎯 Research accepted at iteration {iteration}")
-                    break
-
-                if iteration < Config.MAX_ITERATIONS:
+            while state["phase"] != PHASE_REPORTED:
+                phase = state["phase"]
+
+                if phase == PHASE_CREATED:
+                    # ── Phase 1: Planning ─────────────────────────────
+                    notify("planning", "🧠 Planner Agent is decomposing the research topic...")
+                    self._log_event("Planner", "start", f"Topic: {topic}")
+
+                    plan = self.planner.plan(topic)
+                    state["plan"] = plan
+                    self._log_event("Planner", "complete", f"Generated {len(plan.get('research_questions', []))} questions, {len(plan.get('search_queries', []))} queries")
+                    self._checkpoint(state, PHASE_PLANNED)
+                    notify("planning_done", "✅ Research plan created", plan)
+
+                elif phase in (PHASE_PLANNED, PHASE_REFINED):
+                    # ── Phase 2: Retrieval ────────────────────────────
+                    iteration = state["iteration"] + 1
+                    plan = state["plan"]
+                    all_papers = state["papers"]
+                    notify("iteration_start", f"🔄 Starting iteration {iteration}/{Config.MAX_ITERATIONS}")
+                    notify("retrieving", f"📚 Retriever Agent is searching arXiv ({len(plan.get('search_queries', []))} queries)...")
+                    self._log_event("Retriever", "start", f"Iteration {iteration}")
+
+                    # Queries prefetched during the previous critique are not re-run
+                    prefetched = state.pop("prefetched", {})
+                    pending = []
+                    new_papers = {}
+                    for q in plan.get("search_queries", []):
+                        hit = prefetched.get(q.get("id", "unknown"))
+                        if hit is not None and hit["query"] == q.get("query", ""):
+                            new_papers[q.get("id", "unknown")] = hit["papers"]
+                        else:
+                            pending.append(q)
+                    if prefetched:
+                        self._log_event("Retriever", "prefetch", f"Reused {len(new_papers)} prefetched queries")
+                    new_papers.update(self.retriever.search(pending))
+                    # Merge new papers with existing ones
+                    for qid, papers in new_papers.items():
+                        if qid in all_papers:
+                            existing_ids = {p["arxiv_id"] for p in all_papers[qid]}
+                            for p in papers:
+                                if p.get("arxiv_id") and p["arxiv_id"] not in existing_ids:
+                                    all_papers[qid].append(p)
+                        else:
+                            all_papers[qid] = papers
+
+                    total = self.retriever.get_total_paper_count(all_papers)
+                    state["iteration"] = iteration
+                    self._log_event("Retriever", "complete", f"Total unique papers: {total}")
+                    self._checkpoint(state, PHASE_RETRIEVED)
+                    notify("retrieving_done", f"✅ Retrieved {total} unique papers", {"total_papers": total})
+
+                elif phase == PHASE_RETRIEVED:
+                    # ── Phase 3: Analysis ─────────────────────────────
+                    notify("analyzing", "🔬 Analyzer Agent is synthesizing findings...")
+                    self._log_event("Analyzer", "start", f"Iteration {state['iteration']}")
+
+                    analysis = self.analyzer.analyze(state["papers"], state["plan"].get("research_questions", []))
+                    state["analysis"] = analysis
+                    clusters = len(analysis.get("thematic_clusters", []))
+                    self._log_event("Analyzer", "complete", f"Found {clusters} thematic clusters")
+                    self._checkpoint(state, PHASE_ANALYZED)
+                    notify("analyzing_done", f"✅ Identified {clusters} thematic clusters", analysis)
+
+                elif phase == PHASE_ANALYZED:
+                    # ── Phase 4: Critique ─────────────────────────────
+                    iteration = state["iteration"]
+                    notify("critiquing", "🧐 Critic Agent is evaluating coverage...")
+                    self._log_event("Critic", "start", f"Iteration {iteration}")
+
+                    # Speculatively prepare the next iteration while the critic runs
+                    self._cancel_speculation()
+                    if Config.SPECULATIVE_REFINEMENT and iteration < Config.MAX_ITERATIONS:
+                        self._speculation = self._start_speculation(
+                            json.loads(json.dumps(state["plan"])), state["analysis"]
+                        )
+
+                    critic_eval = self.critic.evaluate(state["plan"], state["analysis"], iteration)
+                    score = critic_eval.get("overall_coverage_score", 0)
+                    recommendation = critic_eval.get("recommendation", "accept")
+                    gaps = critic_eval.get("knowledge_gaps", [])
+                    self._log_event("Critic", "complete", f"Score: {score}/10, Recommendation: {recommendation}, Gaps: {len(gaps)}")
+
+                    total = self.retriever.get_total_paper_count(state["papers"])
+                    previous = session["iterations"][-1] if session["iterations"] else None
+                    session["iterations"].append({
+                        "iteration": iteration,
+                        "papers_found": total,
+                        "clusters": len(state["analysis"].get("thematic_clusters", [])),
+                        "coverage_score": score,
+                        "recommendation": recommendation,
+                        "gaps_found": len(gaps),
+                    })
+                    state["critic_evaluation"] = critic_eval
+                    # ── Check if we should stop ───────────────────────
+                    plateaued = previous is not None and (
+                        score - previous["coverage_score"] < Config.PLATEAU_MIN_SCORE_GAIN
+                        or total - previous["papers_found"] < Config.PLATEAU_MIN_NEW_PAPERS
+                    )
+                    stop_message = None
+                    if recommendation == "accept" or score >= Config.MIN_COVERAGE_SCORE:
+                        self._log_event("Orchestrator", "stop", f"Accepted at iteration {iteration} with score {score}")
+                        stop_message = f"🎯 Research accepted at iteration {iteration}"
+                    elif plateaued:
+                        self._log_event("Orchestrator", "stop", f"Coverage plateaued at iteration {iteration} with score {score}")
+                        stop_message = f"📉 Coverage plateaued — stopping at iteration {iteration}"
+                    state["accepted"] = stop_message is not None
+
+                    # On reject the speculation keeps running until the refine
+                    # phase, so the critique is checkpointed without waiting
+                    if state["accepted"] and self._speculation is not None:
+                        self._cancel_speculation()
+                        self._log_event("Orchestrator", "discard", "Discarded speculative refinement")
+                    self._checkpoint(state, PHASE_CRITIQUED)
+                    notify("critiquing_done", f"✅ Coverage score: {score}/10 — {recommendation.upper()}", critic_eval)
+                    if stop_message:
+                        notify("iteration_accepted", stop_message)
+
+                elif phase == PHASE_CRITIQUED and not state["accepted"] and state["iteration"] < Config.MAX_ITERATIONS:
                     # Refine the plan with gap information
                     notify("refining", "🔄 Planner Agent is refining the search strategy...")
-                    gap_descriptions = [g.get("gap", "") for g in gaps if g.get("severity") in ("critical", "moderate")]
-                    plan = self.planner.refine_plan(plan, gap_descriptions)
+                    gaps = state["critic_evaluation"].get("knowledge_gaps", [])
+                    serious = [g for g in gaps if g.get("severity") in ("critical", "moderate")]
+                    gap_descriptions = [g.get("gap", "") for g in serious]
+                    speculation = self._speculation
+                    speculative_plan = None
+                    if speculation is not None:
+                        # Only the speculative refine call is awaited; the prefetch is
+                        # cancelled and whatever it already fetched is kept
+                        try:
+                            speculative_plan = speculation["plan"].result()
+                        except Exception:
+                            pass
+                        self._cancel_speculation()
+                    if speculative_plan is None:
+                        plan = self.planner.refine_plan(state["plan"], gap_descriptions)
+                    else:
+                        # The speculative plan addresses the analyzer's gaps; the
+                        # critic's gaps are covered by its own suggested queries
+                        plan = self._with_critic_queries(speculative_plan, serious)
+                        state["prefetched"] = dict(speculation["prefetched"])
+                        self._log_event("Planner", "speculative", f"Reused speculative refinement ({len(state['prefetched'])} queries prefetched)")
+                    state["plan"] = plan
+                    self._checkpoint(state, PHASE_REFINED)
                     notify("refining_done", "✅ Research plan refined with new queries")
 
-            # ── Phase 5: Report Generation ────────────────────────────
-            notify("reporting", "📝 Reporter Agent is generating the literature review...")
-            self._log_event("Reporter", "start", "Generating final report")
-
-            metadata = {
-                "iterations": iteration,
-                "total_papers": self.retriever.get_total_paper_count(all_papers),
-            }
-            report = self.reporter.generate_report(plan, analysis, critic_eval, all_papers, metadata)
-            session["final_report"] = report
-            self._log_event("Reporter", "complete", f"Report generated ({len(report)} chars)")
-            notify("reporting_done", "✅ Literature review generated!")
-
-            # ── Finalize ──────────────────────────────────────────────
-            session["status"] = "completed"
-            session["completed_at"] = datetime.now(timezone.utc).isoformat()
-            session["plan"] = plan
-            session["analysis"] = analysis
-            session["critic_evaluation"] = critic_eval
-            session["papers"] = all_papers
-            session["agent_log"] = self.log
-
-            notify("complete", "🎉 Research complete!", {
-                "total_papers": metadata["total_papers"],
-                "iterations": iteration,
-                "coverage_score": critic_eval.get("overall_coverage_score", "N/A"),
-            })
+                else:
+                    # ── Phase 5: Report Generation ────────────────────
+                    notify("reporting", "📝 Reporter Agent is generating the literature review...")
+                    self._log_event("Reporter", "start", "Generating final report")
+
+                    plan = state["plan"]
+                    analysis = state["analysis"]
+                    critic_eval = state["critic_evaluation"]
+                    all_papers = state["papers"]
+                    metadata = {
+                        "iterations": state["iteration"],
+                        "total_papers": self.retriever.get_total_paper_count(all_papers),
+                    }
+                    report = self.reporter.generate_report(plan, analysis, critic_eval, all_papers, metadata)
+                    session["final_report"] = report
+                    self._log_event("Reporter", "complete", f"Report generated ({len(report)} chars)")
+                    notify("reporting_done", "✅ Literature review generated!")
+
+                    # ── Finalize ──────────────────────────────────────
+                    session["status"] = "completed"
+                    session["completed_at"] = datetime.now(timezone.utc).isoformat()
+                    session["plan"] = plan
+                    session["analysis"] = analysis
+                    session["critic_evaluation"] = critic_eval
+                    session["papers"] = all_papers
+                    session["agent_log"] = self.log
+                    self._checkpoint(state, PHASE_REPORTED)
+
+                    notify("complete", "🎉 Research complete!", {
+                        "total_papers": metadata["total_papers"],
+                        "iterations": state["iteration"],
+                        "coverage_score": critic_eval.get("overall_coverage_score", "N/A"),
+                    })
 
         except Exception as exc:
+            # Don't keep refining and querying arXiv for a session that failed
+            self._cancel_speculation()
             session["status"] = "error"
             session["error"] = str(exc)
             self._log_event("Orchestrator", "error", str(exc))
+            # Persist the log and error without advancing the phase, so a
+            # resume picks up from the last phase that actually completed.
+            self._checkpoint(state, state["phase"])
             notify("error", f"❌ Error: {str(exc)}")
 
         return session
@@ -0,0 +1,118 @@
+"""
+HTTP response helpers — fast JSON encoding, ETags and gzip/brotli compression
+for the session results API.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+# Total size of the encoded bodies kept in memory (LRU, keyed by ETag)
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Bodies larger than this are never cached, so one session can't flush the rest
+CACHE_MAX_ENTRY_BYTES = CACHE_MAX_BYTES // 8
+
+_cache: OrderedDict[str, bytes] = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _preferred_encoding() -> str:
+    """The best content encoding the client accepts, honouring q-values (q=0 refuses a coding)."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered, default="identity")
+
+
+def _encode(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def _cache_get(etag: str) -> bytes | None:
+    with _cache_lock:
+        body = _cache.get(etag)
+        if body is not None:
+            _cache.move_to_end(etag)
+        return body
+
+
+def _cache_put(etag: str, body: bytes):
+    global _cache_bytes
+    if len(body) > CACHE_MAX_ENTRY_BYTES:
+        return
+    with _cache_lock:
+        if etag in _cache:
+            return
+        _cache[etag] = body
+        _cache_bytes += len(body)
+        while _cache_bytes > CACHE_MAX_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def cached_response(version: str, build, mimetype: str = "application/json") -> Response:
+    """
+    Return a compressed, ETag-validated response.
+
+    Args:
+        version: Changes whenever the underlying data changes (e.g. session ID
+            plus completion time). Together with the request URL and content
+            coding it forms the ETag, so a matching If-None-Match is answered
+            without building the payload at all.
+        build: Callable returning the payload; a str is sent as-is, anything
+            else is JSON-encoded.
+        mimetype: Content type for the response body.
+    """
+    base = hashlib.sha1(f"{version}|{request.full_path}".encode("utf-8")).hexdigest()
+    preferred = _preferred_encoding()
+    # Each content coding gets its own strong validator (RFC 9110 §8.8.3). Small
+    # bodies are sent uncompressed, so either tag may be the one the client holds.
+    for encoding in {preferred, "identity"}:
+        if f"{base}-{encoding}" in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(f"{base}-{encoding}")
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+    encoding = preferred
+    body = _cache_get(f"{base}-{encoding}")
+    if body is None:
+        payload = build()
+        identity = payload.encode("utf-8") if isinstance(payload, str) else dumps(payload)
+        if len(identity) < MIN_COMPRESS_BYTES:
+            encoding = "identity"
+        body = _encode(identity, encoding)
+        _cache_put(f"{base}-{encoding}", body)
+
+    response = Response(body, mimetype=mimetype)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.set_etag(f"{base}-{encoding}")
+    return response
@@ -6,6 +6,11 @@
 let currentSessionId = null;
 let sessionData = null;
 
+// Fields fetched up front; the report, papers and log are loaded per panel
+const SUMMARY_FIELDS = 'topic,status,iterations,plan,analysis,critic_evaluation,paper_count,log_count';
+const PAGE_SIZE = 50;
+let pagedPanels = {};
+
 // ── Background Particles ───────────────────────────────────────
 (function initParticles() {
     const container = document.getElementById('bgParticles');
@@ -238,10 +243,10 @@ async function fetchFinalResults(sessionId) {
 
     while (retries < maxRetries) {
         try {
-            const resp = await fetch(`/api/research/${sessionId}`);
+            const resp = await fetch(`/api/research/${sessionId}?fields=${SUMMARY_FIELDS}`);
             if (resp.ok) {
                 sessionData = await resp.json();
-                renderResults(sessionData);
+                renderResults(sessionId, sessionData);
                 return;
             }
         } catch (err) {
@@ -255,14 +260,14 @@ async function fetchFinalResults(sessionId) {
 }
 
 // ── Render Results ─────────────────────────────────────────────
-function renderResults(data) {
+function renderResults(sessionId, data) {
     const section = document.getElementById('resultsSection');
     section.classList.remove('hidden');
     section.classList.add('fade-in-up');
     document.getElementById('newResearchBtn').classList.remove('hidden');
 
     // Stats
-    const totalPapers = countUniquePapers(data.papers || {});
+    const totalPapers = data.paper_count || 0;
     const iterations = (data.iterations || []).length;
     const coverage = (data.critic_evaluation || {}).overall_coverage_score || 'N/A';
     const clusters = ((data.analysis || {}).thematic_clusters || []).length;
@@ -272,23 +277,59 @@ function renderResults(data) {
     document.getElementById('statCoverageVal').textContent = coverage + '/10';
     animateCounter('statClustersVal', clusters);
 
-    // Render tabs
-    renderReport(data.final_report || '');
+    // Render tabs — papers and log are fetched when their tab is first opened
     renderPlan(data.plan || {});
     renderAnalysis(data.analysis || {});
     renderCritic(data.critic_evaluation || {});
-    renderPapers(data.papers || {});
-    renderLog(data.agent_log || []);
+    pagedPanels = {
+        papers: { sessionId, offset: 0, loading: false, render: renderPapers },
+        log: { sessionId, offset: 0, loading: false, render: renderLog },
+    };
+    document.getElementById('papersContent').innerHTML = '';
+    document.getElementById('logContent').innerHTML = '';
+    loadReport(sessionId);
 }
 
-function countUniquePapers(papers) {
-    const ids = new Set();
-    for (const [, list] of Object.entries(papers)) {
-        for (const p of list) {
-            if (p.arxiv_id) ids.add(p.arxiv_id);
+async function loadReport(sessionId) {
+    try {
+        const resp = await fetch(`/api/research/${sessionId}/report`);
+        renderReport(resp.ok ? await resp.text() : '');
+    } catch (err) {
+        console.error('Report fetch error:', err);
+        renderReport('');
+    }
+}
+
+// Fetch the next page of a paginated panel ('papers' or 'log')
+async function loadNextPage(panel) {
+    const state = pagedPanels[panel];
+    if (!state || state.loading) return;
+    state.loading = true;
+    try {
+        const resp = await fetch(`/api/research/${state.sessionId}/${panel}?offset=${state.offset}&limit=${PAGE_SIZE}`);
+        if (resp.ok) {
+            const page = await resp.json();
+            state.render(page.items, page.total, state.offset > 0);
+            state.offset += page.items.length;
+            state.done = state.offset >= page.total;
+            renderLoadMore(panel, !state.done);
         }
+    } catch (err) {
+        console.error(`Fetch error (${panel}):`, err);
     }
-    return ids.size;
+    state.loading = false;
+}
+
+function renderLoadMore(panel, visible) {
+    const container = document.getElementById(`${panel}Content`);
+    const existing = container.querySelector('.load-more');
+    if (existing) existing.remove();
+    if (!visible) return;
+    const btn = document.createElement('button');
+    btn.className = 'btn-secondary load-more';
+    btn.textContent = 'Load more';
+    btn.onclick = () => loadNextPage(panel);
+    container.appendChild(btn);
 }
 
 function animateCounter(id, target) {
@@ -502,23 +543,11 @@ function renderCritic(critic) {
 }
 
 // ── Render: Papers ─────────────────────────────────────────────
-function renderPapers(papers) {
+function renderPapers(papers, total, append) {
     const container = document.getElementById('papersContent');
-    const allPapers = [];
-    const seen = new Set();
-
-    for (const [, list] of Object.entries(papers)) {
-        for (const p of list) {
-            if (p.arxiv_id && !seen.has(p.arxiv_id)) {
-                seen.add(p.arxiv_id);
-                allPapers.push(p);
-            }
-        }
-    }
+    let html = append ? '' : `<div class="plan-block-title">📄 ${total} Papers Retrieved</div>`;
 
-    let html = `<div class="plan-block-title">📄 ${allPapers.length} Papers Retrieved</div>`;
-
-    for (const p of allPapers) {
+    for (const p of papers) {
         html += `<div class="paper-card">
             <div class="paper-title">${escapeHtml(p.title || 'Untitled')}</div>
             <div class="paper-authors">${escapeHtml((p.authors || []).join(', '))}</div>
@@ -531,11 +560,15 @@ function renderPapers(papers) {
         </div>`;
     }
 
-    container.innerHTML = html;
+    if (append) {
+        container.insertAdjacentHTML('beforeend', html);
+    } else {
+        container.innerHTML = html;
+    }
 }
 
 // ── Render: Agent Log ──────────────────────────────────────────
-function renderLog(log) {
+function renderLog(log, total, append) {
     const container = document.getElementById('logContent');
     let html = '';
 
@@ -548,7 +581,11 @@ function renderLog(log) {
         </div>`;
     }
 
-    container.innerHTML = html;
+    if (append) {
+        container.insertAdjacentHTML('beforeend', html);
+    } else {
+        container.innerHTML = html;
+    }
 }
 
 // ── Tab Switching ──────────────────────────────────────────────
@@ -558,12 +595,18 @@ function switchTab(tabName) {
 
     document.querySelector(`.tab-btn[data-tab="${tabName}"]`).classList.add('active');
     document.getElementById(`tab-${tabName}`).classList.add('active');
+
+    const panel = pagedPanels[tabName];
+    if (panel && panel.offset === 0 && !panel.done) {
+        loadNextPage(tabName);
+    }
 }
 
 // ── Reset UI ───────────────────────────────────────────────────
 function resetUI() {
     currentSessionId = null;
     sessionData = null;
+    pagedPanels = {};
     currentIteration = 0;
     activeSet.clear();
 
@@ -0,0 +1,118 @@
+"""
+Shared fixtures: an orchestrator wired to fake agents and a temp checkpoint
+directory, so pipeline tests never call Gemini or arXiv.
+"""
+import threading
+import time
+
+import pytest
+
+from checkpoint import CheckpointStore
+from config import Config
+from orchestrator import ResearchOrchestrator
+
+
+class FakeAgents:
+    """Scripted stand-ins for the five agents, recording every call in order."""
+
+    def __init__(self):
+        self.calls: list[tuple] = []
+        self.critic_results: list[dict] = []  # One evaluation per iteration; the last repeats
+        self.search_delay = 0.0
+        self.fail_on: str | None = None  # Name of a call that raises once...
+        self.fail_after = 0  # ...after this many successful calls of that name
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call + (threading.current_thread().name,))
+        if self.fail_on == call[0]:
+            if self.fail_after:
+                self.fail_after -= 1
+                return
+            self.fail_on = None
+            raise RuntimeError(f"{call[0]} failed")
+
+    # Planner
+    def plan(self, topic):
+        self._record("plan", topic)
+        return {
+            "main_topic": topic,
+            "research_questions": [{"id": "Q1", "question": "What?"}],
+            "search_queries": [{"id": "S1", "query": "base"}],
+        }
+
+    def refine_plan(self, plan, gaps, source="critic"):
+        self._record("refine", source)
+        queries = plan.get("search_queries", [])
+        extra = [{"id": f"S{len(queries) + i + 1}", "query": f"{source}-{len(queries) + i}"} for i in range(3)]
+        return {**plan, "search_queries": queries + extra}
+
+    # Retriever
+    def search(self, queries, cancel_event=None):
+        results = {}
+        for q in queries:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            self._record("search", q["query"])
+            time.sleep(self.search_delay)
+            results[q["id"]] = [{"arxiv_id": f"{q['query']}-{i}"} for i in range(4)]
+        return results
+
+    @staticmethod
+    def get_total_paper_count(results):
+        return sum(len(papers) for papers in results.values())
+
+    # Analyzer
+    def analyze(self, papers, questions):
+        self._record("analyze")
+        return {
+            "thematic_clusters": [{}],
+            "question_coverage": [{"question_id": "Q1", "coverage_level": "not_covered", "summary": "thin"}],
+        }
+
+    # Critic
+    def evaluate(self, plan, analysis, iteration):
+        self._record("critic", iteration)
+        return self.critic_results[min(iteration, len(self.critic_results)) - 1]
+
+    # Reporter
+    def generate_report(self, plan, analysis, critic_eval, papers, metadata):
+        self._record("report")
+        return "# Report"
+
+    def names(self, thread_prefix: str | None = None) -> list[str]:
+        """Call names in order, optionally only those made on a given thread."""
+        return [c[0] for c in self.calls if thread_prefix is None or c[-1].startswith(thread_prefix)]
+
+
+@pytest.fixture
+def fake_agents():
+    return FakeAgents()
+
+
+@pytest.fixture
+def make_orchestrator(tmp_path, monkeypatch, fake_agents):
+    """Factory for orchestrators sharing one temp checkpoint store and the fake agents."""
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "test-key")
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    def make(session_id="s1"):
+        orchestrator = ResearchOrchestrator(session_id=session_id, checkpoint_store=store)
+        orchestrator.planner = orchestrator.retriever = fake_agents
+        orchestrator.analyzer = orchestrator.critic = orchestrator.reporter = fake_agents
+        return orchestrator
+
+    return make
+
+
+def reject(score=3, suggested_query="critic-gap"):
+    return {
+        "overall_coverage_score": score,
+        "recommendation": "iterate",
+        "knowledge_gaps": [{"gap": "missing", "severity": "critical", "suggested_query": suggested_query}],
+    }
+
+
+def accept(score=8):
+    return {"overall_coverage_score": score, "recommendation": "accept", "knowledge_gaps": []}
@@ -0,0 +1,56 @@
+"""
+Tests for the session result endpoints, against a temporary SQLite broker.
+"""
+import pytest
+
+import app as app_module
+from broker import SQLiteBroker
+
+
+@pytest.fixture
+def broker(tmp_path, monkeypatch):
+    broker = SQLiteBroker(str(tmp_path / "broker.sqlite3"))
+    loads = []
+    real_get_result = broker.get_result
+    monkeypatch.setattr(broker, "get_result", lambda key: loads.append(key) or real_get_result(key))
+    broker.loads = loads
+    monkeypatch.setattr(app_module, "broker", broker)
+    app_module._sessions.clear()
+    return broker
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def save_session(broker, session_id="s1", papers=120):
+    broker.save_result(f"session:{session_id}", {
+        "status": "completed",
+        "papers": {"S1": [{"arxiv_id": str(i), "title": f"Paper {i}"} for i in range(papers)]},
+        "agent_log": [],
+        "final_report": "# Report",
+    })
+
+
+def test_pages_decode_the_session_once(broker, client):
+    save_session(broker)
+    first = client.get("/api/research/s1/papers?offset=0&limit=50")
+    second = client.get("/api/research/s1/papers?offset=50&limit=50")
+    again = client.get("/api/research/s1/papers?offset=0&limit=50", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_json()["items"][0]["arxiv_id"] == "50"
+    assert again.status_code == 304
+    assert broker.loads == ["session:s1"]
+
+
+def test_saving_a_session_again_changes_its_version(broker, client):
+    save_session(broker, papers=10)
+    first = client.get("/api/research/s1?fields=paper_count")
+    save_session(broker, papers=20)
+    second = client.get("/api/research/s1?fields=paper_count", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert second.get_json() == {"paper_count": 20}
+    assert len(broker.loads) == 2
@@ -0,0 +1,89 @@
+"""
+Tests for batch research: shared planning and arXiv deduplication, using a
+fake Gemini client and arXiv search.
+"""
+import json
+
+import pytest
+
+import agents.retriever as retriever
+from agents.base import BaseAgent
+from agents.planner import PLANNER_SYSTEM, PlannerAgent
+from batch import BatchResearchRunner
+from checkpoint import CheckpointStore
+from config import Config
+
+
+def fake_plan(topic):
+    return {
+        "main_topic": topic,
+        "research_questions": [{"id": "Q1", "question": topic}],
+        "search_queries": [{"id": "S1", "query": "shared"}, {"id": "S2", "query": topic}],
+    }
+
+
+def fake_paper(arxiv_id):
+    return {
+        "arxiv_id": arxiv_id,
+        "title": arxiv_id,
+        "authors": [],
+        "abstract": "",
+        "published": "2024-01-01",
+        "categories": [],
+        "primary_category": "",
+    }
+
+
+@pytest.fixture
+def llm(monkeypatch, tmp_path):
+    """Fake Gemini and arXiv: returns (system prompts of LLM calls, arXiv queries sent)."""
+    calls = []
+
+    def generate(agent, model, prompt, system_instruction=""):
+        calls.append(system_instruction)
+        if system_instruction == PLANNER_SYSTEM:
+            topics = [line.split(". ", 1)[1] for line in prompt.splitlines() if line[:1].isdigit()]
+            if topics:
+                return json.dumps([fake_plan(t) for t in topics])
+            return json.dumps(fake_plan(prompt.rsplit("\n", 1)[-1]))
+        if "Critic" in system_instruction:
+            return json.dumps({"overall_coverage_score": 9, "recommendation": "accept"})
+        if "Report" in system_instruction:
+            return "# Report"
+        return "{}"
+
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(Config, "REPORT_OUTPUT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(BaseAgent, "_generate", generate)
+    monkeypatch.setattr(retriever, "ARXIV_REQUEST_INTERVAL", 0)
+    searches = []
+    monkeypatch.setattr(
+        retriever.RetrieverAgent, "_search_arxiv",
+        lambda self, query: searches.append(query) or [fake_paper(f"{query}-{i}") for i in range(3)],
+    )
+    return calls, searches
+
+
+def test_batch_plans_topics_together_and_dedupes_queries(llm, tmp_path):
+    calls, searches = llm
+    topics = [f"topic {i}" for i in range(7)]
+    runner = BatchResearchRunner(checkpoint_store=CheckpointStore(str(tmp_path / "cp")))
+    summary = runner.run(topics + ["Topic 0 "])
+
+    assert summary["skipped_duplicates"] == 1
+    assert all(entry["status"] == "completed" for entry in summary["topics"])
+    # 7 topics in chunks of 5: two planner calls instead of seven
+    assert calls.count(PLANNER_SYSTEM) == 2
+    # The query every plan shares was sent to arXiv once
+    assert searches.count("shared") == 1
+
+
+def test_plan_many_falls_back_to_single_plans(llm, monkeypatch):
+    calls, _ = llm
+    planner = PlannerAgent()
+    monkeypatch.setattr(planner, "_call_llm", lambda prompt, system_instruction="", tier=None: (
+        calls.append(prompt) or (json.dumps([fake_plan("only one")]) if "\n1. " in prompt else json.dumps(fake_plan("single")))
+    ))
+    plans = planner.plan_many(["a", "b"])
+    assert [p["main_topic"] for p in plans] == ["single", "single"]
+    assert len(calls) == 3
@@ -0,0 +1,115 @@
+"""
+Tests for the SQLite broker shared by the web app and the worker pool, using
+a temporary database file.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from broker import SQLiteBroker
+
+
+@pytest.fixture
+def broker(tmp_path):
+    return SQLiteBroker(str(tmp_path / "broker.sqlite3"), poll_interval=0.01)
+
+
+def test_reserve_spaces_slots_across_brokers(broker):
+    # A second broker on the same file stands in for another worker process
+    other = SQLiteBroker(broker.path)
+    assert broker.reserve("arxiv", 1.0) == pytest.approx(0.0, abs=0.05)
+    assert other.reserve("arxiv", 1.0) == pytest.approx(1.0, abs=0.05)
+    assert broker.reserve("arxiv", 1.0) == pytest.approx(2.0, abs=0.05)
+    assert broker.reserve("other", 1.0) == pytest.approx(0.0, abs=0.05)
+
+
+def events(broker, stream_id):
+    """Every event published so far on a stream."""
+    found = []
+    for event in broker.listen(stream_id, timeout=0.05):
+        if event is None:
+            return found
+        found.append(event)
+
+
+def job_status(broker, job_id):
+    return broker._connect().execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def test_claim_hands_each_job_to_exactly_one_worker(broker):
+    for i in range(40):
+        broker.enqueue("research", {"session_id": f"s{i}", "topic": "t"}, f"s{i}")
+
+    claimed = []
+
+    def drain(worker_index):
+        # Separate broker objects, like separate worker processes, on one file
+        own = SQLiteBroker(broker.path)
+        while (job := own.claim(f"w{worker_index}")) is not None:
+            claimed.append(job[0])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(drain, range(8)))
+
+    assert sorted(claimed) == list(range(1, 41))
+    assert broker.claim("late") is None
+
+
+def test_claim_takes_the_oldest_queued_job(broker):
+    broker.enqueue("research", {"session_id": "a", "topic": "t"}, "a")
+    broker.enqueue("batch", {"batch_id": "b", "topics": ["t"]}, "b")
+    job_id, kind, payload = broker.claim("w")
+    assert (kind, payload["session_id"]) == ("research", "a")
+    assert job_status(broker, job_id) == "running"
+
+
+def test_stale_running_job_is_failed_with_an_error_event(broker):
+    broker.open_stream("s1")
+    broker.enqueue("research", {"session_id": "s1", "topic": "t"}, "s1")
+    job_id, _, _ = broker.claim("w")
+    assert broker.is_running("s1")
+
+    broker._connect().execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - 3600, job_id))
+    assert not broker.is_running("s1")
+    assert job_status(broker, job_id) == "failed"
+    assert [e["stage"] for e in events(broker, "s1")] == ["error"]
+
+    # Reaping again does not publish a second error
+    broker.reap_stale()
+    assert len(events(broker, "s1")) == 1
+
+
+def test_heartbeat_keeps_a_job_alive(broker):
+    broker.enqueue("research", {"session_id": "s1", "topic": "t"}, "s1")
+    job_id, _, _ = broker.claim("w")
+    broker._connect().execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - 3600, job_id))
+    broker.heartbeat(job_id)
+    assert broker.is_running("s1")
+    assert job_status(broker, job_id) == "running"
+
+
+def test_finished_job_is_not_running(broker):
+    broker.enqueue("research", {"session_id": "s1", "topic": "t"}, "s1")
+    assert broker.is_running("s1")
+    job_id, _, _ = broker.claim("w")
+    broker.finish(job_id, "done")
+    assert not broker.is_running("s1")
+
+
+def test_open_stream_discards_events_of_a_previous_run(broker):
+    broker.open_stream("s1")
+    broker.publish("s1", {"stage": "error", "message": "old", "data": None})
+    broker.open_stream("s1")
+    broker.publish("s1", {"stage": "planning", "message": "new", "data": None})
+    assert [e["message"] for e in events(broker, "s1")] == ["new"]
+    assert broker.has_stream("s1")
+
+
+def test_purge_keeps_live_jobs(broker):
+    broker.enqueue("research", {"session_id": "queued", "topic": "t"}, "queued")
+    broker.enqueue("research", {"session_id": "done", "topic": "t"}, "done")
+    broker.finish(2, "done")
+    broker.purge(-1)
+    remaining = broker._connect().execute("SELECT stream_id FROM jobs").fetchall()
+    assert remaining == [("queued",)]
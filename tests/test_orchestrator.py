@@ -0,0 +1,65 @@
+"""
+Tests for the orchestrator's speculative refinement, using fake agents.
+"""
+import time
+
+from conftest import accept, reject
+
+
+def test_reject_uses_speculative_plan_without_second_refine(make_orchestrator, fake_agents):
+    fake_agents.critic_results = [reject(), accept()]
+    fake_agents.search_delay = 0.3
+    session = make_orchestrator().run("topic")
+
+    assert session["status"] == "completed"
+    # Refinement only ever ran in the background, never on the critical path
+    assert "refine" not in fake_agents.names("MainThread")
+    assert fake_agents.names("speculate").count("refine") >= 1
+    # The critic's suggested query went into the plan without another LLM call
+    assert "critic-gap" in [c[1] for c in fake_agents.calls if c[0] == "search"]
+
+
+def test_refine_does_not_wait_for_the_whole_prefetch(make_orchestrator, fake_agents):
+    fake_agents.critic_results = [reject(), accept()]
+    fake_agents.search_delay = 0.5
+    make_orchestrator().run("topic")
+
+    # Three analyzer-gap queries were speculated; the refine phase cancelled the
+    # prefetch after at most the one already in flight
+    assert fake_agents.names("speculate").count("search") <= 1
+
+
+def test_prefetched_queries_are_not_searched_again(make_orchestrator, fake_agents):
+    fake_agents.critic_results = [reject(), accept()]
+    fake_agents.search_delay = 0.2
+    orchestrator = make_orchestrator()
+    real_evaluate = fake_agents.evaluate
+
+    def slow_evaluate(plan, analysis, iteration):
+        if iteration == 1:
+            # Let the speculation prefetch everything before the critic rejects
+            time.sleep(1.0)
+        return real_evaluate(plan, analysis, iteration)
+
+    orchestrator.critic = type("Critic", (), {"evaluate": staticmethod(slow_evaluate)})()
+    orchestrator.run("topic")
+
+    searches = [c[1] for c in fake_agents.calls if c[0] == "search"]
+    speculated = [c[1] for c in fake_agents.calls if c[0] == "search" and c[-1].startswith("speculate")]
+    assert len(speculated) == 3
+    for query in speculated:
+        assert searches.count(query) == 1
+
+
+def test_error_cancels_speculation(make_orchestrator, fake_agents):
+    fake_agents.critic_results = [reject()]
+    fake_agents.search_delay = 0.3
+    fake_agents.fail_on = "critic"
+    orchestrator = make_orchestrator()
+    session = orchestrator.run("topic")
+
+    assert session["status"] == "error"
+    assert orchestrator._speculation is None
+    time.sleep(1.5)
+    # At most the query in flight when the critic failed was prefetched
+    assert fake_agents.names("speculate").count("search") <= 1
@@ -0,0 +1,33 @@
+"""
+Tests for content-coding negotiation in the response helpers.
+"""
+import pytest
+from flask import Flask
+
+import responses
+
+app = Flask(__name__)
+
+
+def negotiate(accept_encoding):
+    with app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+        return responses._preferred_encoding()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", "identity"),
+    ("gzip;q=0, identity", "identity"),
+    ("gzip;q=0.5, deflate", "gzip"),
+    ("", "identity"),
+])
+def test_gzip_negotiation(monkeypatch, header, expected):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert negotiate(header) == expected
+
+
+def test_refused_brotli_falls_back_to_gzip(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", object())
+    assert negotiate("br;q=0, gzip") == "gzip"
+    assert negotiate("br, gzip") == "br"
+    assert negotiate("br;q=0.2, gzip;q=0.8") == "gzip"
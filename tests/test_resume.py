@@ -0,0 +1,76 @@
+"""
+Tests for checkpointing and resuming a research session from each phase,
+using fake agents and a temporary checkpoint directory.
+"""
+import pytest
+
+from config import Config
+from conftest import accept, reject
+from orchestrator import (
+    PHASE_ANALYZED, PHASE_CREATED, PHASE_CRITIQUED, PHASE_PLANNED, PHASE_REFINED, PHASE_REPORTED,
+    PHASE_RETRIEVED,
+)
+
+
+@pytest.fixture(autouse=True)
+def serial_refinement(monkeypatch, fake_agents):
+    # Keep every call on the main thread so call order is deterministic
+    monkeypatch.setattr(Config, "SPECULATIVE_REFINEMENT", False)
+    fake_agents.critic_results = [reject(), accept()]
+
+
+@pytest.mark.parametrize("fail_on, fail_after, phase", [
+    ("plan", 0, PHASE_CREATED),
+    ("search", 0, PHASE_PLANNED),
+    ("analyze", 0, PHASE_RETRIEVED),
+    ("critic", 0, PHASE_ANALYZED),
+    ("refine", 0, PHASE_CRITIQUED),
+    ("search", 2, PHASE_REFINED),  # mid-way through the second retrieval
+    ("report", 0, PHASE_CRITIQUED),
+])
+def test_resume_continues_from_the_last_completed_phase(make_orchestrator, fake_agents, fail_on, fail_after, phase):
+    fake_agents.fail_on, fake_agents.fail_after = fail_on, fail_after
+    failed = make_orchestrator().run("topic")
+    assert failed["status"] == "error"
+    state = make_orchestrator().checkpoints.load("s1")
+    assert state["phase"] == phase
+    assert state["log"][-1]["action"] == "error"
+
+    before = len(fake_agents.calls)
+    session = make_orchestrator().resume()
+    resumed = [c[0] for c in fake_agents.calls[before:]]
+
+    assert session["status"] == "completed"
+    assert "error" not in session
+    # The failed call is the first one repeated; nothing before it is
+    assert resumed[0] == fail_on
+    assert resumed[-1] == "report"
+    if fail_on != "plan":
+        assert "plan" not in resumed
+    # Each iteration is recorded once, however many times the session ran
+    assert [i["iteration"] for i in session["iterations"]] == [1, 2]
+    arxiv_ids = [p["arxiv_id"] for papers in session["papers"].values() for p in papers]
+    assert len(arxiv_ids) == len(set(arxiv_ids))
+    assert make_orchestrator().checkpoints.load("s1")["phase"] == PHASE_REPORTED
+
+
+def test_resume_keeps_the_log_of_the_failed_run(make_orchestrator, fake_agents):
+    fake_agents.fail_on = "report"
+    make_orchestrator().run("topic")
+    session = make_orchestrator().resume()
+    actions = [(e["agent"], e["action"]) for e in session["agent_log"]]
+    assert ("Planner", "start") in actions
+    assert actions.index(("Orchestrator", "error")) < actions.index(("Orchestrator", "resume"))
+
+
+def test_resume_of_a_reported_session_does_nothing(make_orchestrator, fake_agents):
+    make_orchestrator().run("topic")
+    before = len(fake_agents.calls)
+    session = make_orchestrator().resume()
+    assert session["status"] == "completed"
+    assert len(fake_agents.calls) == before
+
+
+def test_resume_without_a_checkpoint_raises(make_orchestrator):
+    with pytest.raises(KeyError):
+        make_orchestrator("missing").resume()
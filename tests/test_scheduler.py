@@ -0,0 +1,180 @@
+"""
+Tests for the LLM scheduler's retries, hedging and concurrency limits,
+using fake request functions in place of Gemini calls.
+"""
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+from agents.scheduler import LLMError, LLMScheduler, _Slot
+from config import Config
+
+MODEL = "fake-model"
+
+
+class FakeRequest:
+    """Callable standing in for a Gemini request; counts calls and concurrency."""
+
+    def __init__(self, duration=0.0, failures=()):
+        self.duration = duration
+        self.failures = list(failures)
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failure = self.failures.pop(0) if self.failures else None
+        try:
+            time.sleep(self.duration() if callable(self.duration) else self.duration)
+            if failure is not None:
+                raise failure
+            return "ok"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class StatusError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture(autouse=True)
+def fast_config(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_MODEL_CONCURRENCY", {MODEL: 2})
+    monkeypatch.setattr(Config, "LLM_MAX_RETRIES", 3)
+    monkeypatch.setattr(Config, "LLM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(Config, "LLM_BACKOFF_MAX", 0.05)
+    monkeypatch.setattr(Config, "LLM_HEDGING", True)
+    monkeypatch.setattr(Config, "LLM_HEDGE_MIN_SAMPLES", 5)
+
+
+def warm_up(scheduler, seconds, caller=""):
+    """Give the scheduler a latency history so hedging is enabled."""
+    for _ in range(Config.LLM_HEDGE_MIN_SAMPLES):
+        scheduler._record_latency(MODEL, caller, seconds)
+
+
+def test_retries_transient_errors_then_succeeds():
+    fn = FakeRequest(failures=[StatusError(429), StatusError(503)])
+    assert LLMScheduler().call(MODEL, fn) == "ok"
+    assert fn.calls == 3
+
+
+def test_timed_out_attempt_is_retried():
+    fn = FakeRequest(failures=[TimeoutError("The read operation timed out")])
+    assert LLMScheduler().call(MODEL, fn) == "ok"
+    assert fn.calls == 2
+
+
+def test_non_retryable_error_fails_immediately():
+    fn = FakeRequest(failures=[StatusError(400)])
+    with pytest.raises(LLMError):
+        LLMScheduler().call(MODEL, fn)
+    assert fn.calls == 1
+
+
+def test_gives_up_after_max_retries():
+    fn = FakeRequest(failures=[StatusError(429)] * 10)
+    with pytest.raises(LLMError):
+        LLMScheduler().call(MODEL, fn)
+    assert fn.calls == Config.LLM_MAX_RETRIES + 1
+
+
+def test_concurrency_limit_is_respected():
+    scheduler = LLMScheduler()
+    fn = FakeRequest(duration=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: scheduler.call(MODEL, fn), range(8)))
+    assert fn.max_active == 2
+    assert fn.calls == 8
+
+
+def test_slow_request_is_hedged():
+    scheduler = LLMScheduler()
+    warm_up(scheduler, 0.05)
+    durations = iter([3.0, 0.05])
+    fn = FakeRequest(duration=lambda: next(durations, 0.05))
+    start = time.monotonic()
+    assert scheduler.call(MODEL, fn) == "ok"
+    assert fn.calls == 2
+    # Answered by the hedge, well before the stuck primary finishes
+    assert time.monotonic() - start < 2.0
+
+
+def test_losing_request_keeps_its_slot_until_it_returns():
+    scheduler = LLMScheduler()
+    warm_up(scheduler, 0.05)
+    durations = iter([1.0, 0.05])
+    fn = FakeRequest(duration=lambda: next(durations, 0.05))
+    scheduler.call(MODEL, fn)
+    # The hedge won, but the abandoned primary is still in flight
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(lambda _: scheduler.call(MODEL, fn), range(2)))
+    assert fn.max_active <= 2
+
+
+def test_unsent_hedge_is_skipped():
+    scheduler = LLMScheduler()
+    slot = _Slot(scheduler._limit(MODEL))
+    assert slot.acquire(blocking=False)
+    slot.abandon()
+    fn = FakeRequest()
+    with pytest.raises(CancelledError):
+        scheduler._timed_call(MODEL, "", slot, fn)
+    assert fn.calls == 0
+    # Its slot was returned, so both slots are free
+    semaphore = scheduler._limit(MODEL)
+    assert semaphore.acquire(blocking=False) and semaphore.acquire(blocking=False)
+
+
+def test_queue_wait_does_not_trigger_hedging():
+    scheduler = LLMScheduler()
+    warm_up(scheduler, 0.25)
+    fn = FakeRequest(duration=0.2)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda _: scheduler.call(MODEL, fn), range(16)))
+    # Most calls queue for over a second, far past p95, yet none was hedged
+    assert fn.calls == 16
+    assert fn.max_active == 2
+
+
+def test_no_hedge_without_a_free_slot():
+    scheduler = LLMScheduler()
+    warm_up(scheduler, 0.05)
+    blocker = FakeRequest(duration=0.5)
+    slow = FakeRequest(duration=0.3)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        held = pool.submit(scheduler.call, MODEL, blocker, "other")
+        time.sleep(0.05)
+        assert scheduler.call(MODEL, slow) == "ok"
+        held.result()
+    assert slow.calls == 1
+
+
+def test_latency_history_is_kept_per_caller():
+    scheduler = LLMScheduler()
+    warm_up(scheduler, 0.05, caller="CriticAgent")
+    assert scheduler.hedge_after(MODEL, "CriticAgent") == 0.05
+    assert scheduler.hedge_after(MODEL, "ReporterAgent") is None
+
+
+def test_limits_are_shared_across_processes(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_DEFAULT_CONCURRENCY", 8)
+    scheduler = LLMScheduler()
+    scheduler.share_limits(4)
+    fn = FakeRequest(duration=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: scheduler.call("other-model", fn), range(8)))
+    assert fn.max_active == 2
+    # A limit smaller than the process count still leaves each process one slot
+    assert scheduler._limit(MODEL).acquire(blocking=False)
+    assert not scheduler._limit(MODEL).acquire(blocking=False)
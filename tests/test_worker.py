@@ -0,0 +1,41 @@
+"""
+Tests for the worker loop's resilience to broker errors.
+"""
+import sqlite3
+
+import pytest
+
+import worker
+
+
+class Stop(BaseException):
+    """Ends the otherwise endless worker loop."""
+
+
+class FlakyBroker:
+    """Broker whose claim fails with a locked database, then succeeds with no job."""
+
+    poll_interval = 0.0
+
+    def __init__(self):
+        self.claims = 0
+
+    def claim(self, worker_id):
+        self.claims += 1
+        if self.claims == 1:
+            raise sqlite3.OperationalError("database is locked")
+        if self.claims == 3:
+            raise Stop()
+        return None
+
+    def reap_stale(self):
+        pass
+
+
+def test_worker_survives_broker_errors(monkeypatch, tmp_path):
+    broker = FlakyBroker()
+    monkeypatch.setattr(worker, "SQLiteBroker", lambda: broker)
+    monkeypatch.setattr(worker, "CheckpointStore", lambda: None)
+    with pytest.raises(Stop):
+        worker.work(0)
+    assert broker.claims == 3
@@ -0,0 +1,114 @@
+"""
+Research worker pool — runs queued research jobs in separate processes when
+the app is deployed with BROKER=sqlite, so web workers only serve HTTP.
+
+Usage:
+    BROKER=sqlite python worker.py --processes 4
+"""
+import argparse
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import threading
+import time
+import traceback
+
+from agents.scheduler import scheduler
+from broker import SQLiteBroker
+from checkpoint import CheckpointStore
+from config import Config
+from jobs import execute_job
+
+# How long finished jobs and their event streams are kept in the broker
+EVENT_RETENTION_SECONDS = 24 * 3600
+
+
+def work(worker_index: int, processes: int = 1):
+    """Claim and execute jobs until the process is terminated."""
+    # Each process has its own LLM scheduler; together they stay within the limits
+    scheduler.share_limits(processes)
+    broker = SQLiteBroker()
+    checkpoints = CheckpointStore()
+    worker_id = f"{os.getpid()}-{worker_index}"
+
+    while True:
+        try:
+            if not _run_next_job(broker, checkpoints, worker_id):
+                time.sleep(broker.poll_interval)
+        except Exception:
+            # Broker errors (e.g. "database is locked") must not shrink the pool
+            traceback.print_exc()
+            time.sleep(broker.poll_interval)
+
+
+def _run_next_job(broker: SQLiteBroker, checkpoints: CheckpointStore, worker_id: str) -> bool:
+    """Claim and execute one job; False if the queue was empty."""
+    job = broker.claim(worker_id)
+    if job is None:
+        broker.reap_stale()
+        return False
+
+    job_id, kind, payload = job
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(broker, job_id, stop), daemon=True)
+    beat.start()
+    try:
+        execute_job(broker, checkpoints, kind, payload)
+        status = "done"
+    except Exception:
+        traceback.print_exc()
+        status = "failed"
+    finally:
+        stop.set()
+        beat.join()
+    broker.finish(job_id, status)
+    broker.purge(EVENT_RETENTION_SECONDS)
+    return True
+
+
+def _heartbeat(broker: SQLiteBroker, job_id: int, stop: threading.Event):
+    """Keep a claimed job marked alive until stop is set."""
+    while not stop.wait(Config.JOB_HEARTBEAT_SECONDS):
+        try:
+            broker.heartbeat(job_id)
+        except Exception:
+            traceback.print_exc()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point for the worker pool."""
+    parser = argparse.ArgumentParser(description="Run research jobs from the shared broker.")
+    parser.add_argument("--processes", type=int, default=Config.WORKER_PROCESSES, help="Worker processes to start")
+    args = parser.parse_args(argv)
+
+    if Config.BROKER != "sqlite":
+        parser.error("the worker pool needs BROKER=sqlite (the local broker runs jobs inside the web process)")
+
+    SQLiteBroker()  # create the schema once before the workers race for it
+
+    def start(i: int) -> multiprocessing.Process:
+        p = multiprocessing.Process(target=work, args=(i, args.processes), name=f"research-worker-{i}", daemon=True)
+        p.start()
+        return p
+
+    processes = [start(i) for i in range(args.processes)]
+    print(f"Started {len(processes)} research workers on {Config.BROKER_PATH}", flush=True)
+
+    try:
+        # Replace any worker that exits, so the pool never silently shrinks
+        while True:
+            multiprocessing.connection.wait([p.sentinel for p in processes])
+            for i, p in enumerate(processes):
+                if not p.is_alive():
+                    print(f"{p.name} exited with code {p.exitcode}; restarting", flush=True)
+                    time.sleep(1)  # don't spin if a worker keeps dying at startup
+                    processes[i] = start(i)
+    except KeyboardInterrupt:
+        for p in processes:
+            p.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())